@@ -1,32 +1,134 @@
-from pynput import keyboard, mouse
+from array import array
 import time
 
+
+class TimestampRing:
+    """
+    Fixed-size ring buffer of increasing timestamps backed by an array('d').
+    Appending never allocates; once full, the oldest entries are overwritten.
+    """
+
+    def __init__(self, capacity=8192):
+        self.capacity = capacity
+        self._buf = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, t):
+        self._buf[self._next] = t
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _at(self, i):
+        # i-th oldest entry
+        return self._buf[(self._next - self._size + i) % self.capacity]
+
+    def last(self):
+        return self._at(self._size - 1) if self._size else None
+
+    def count_since(self, t0):
+        """
+        Number of timestamps >= t0 (binary search, entries are in time order).
+        """
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._at(mid) < t0:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._size - lo
+
+
 class ActivityTracker:
-    def __init__(self):
+    """
+    Keyboard / mouse activity from pynput listeners. With listen=False no
+    hooks are installed and events come from whoever calls on_keypress /
+    on_click / on_move (e.g. fakes.ScriptedInput); `clock` timestamps them.
+    """
+
+    def __init__(self, track_mouse_moves=False, move_interval=0.25, capacity=8192,
+                 listen=True, clock=time.monotonic):
+        self.clock = clock
         self.keyboard_presses = 0
         self.mouse_clicks = 0
         self.last_keyboard_time = None
         self.last_mouse_time = None
 
-        self.keyboard_listener = keyboard.Listener(on_press=self.on_keypress)
-        self.mouse_listener = mouse.Listener(on_click=self.on_click)
+        # monotonic timestamps for rolling rates and idle detection
+        self.key_times = TimestampRing(capacity)
+        self.click_times = TimestampRing(capacity)
+        self.move_times = TimestampRing(capacity)
+        self.move_interval = move_interval
+        self._last_move_sample = float("-inf")
+        self._started_at = clock()
 
-        self.keyboard_listener.start()
-        self.mouse_listener.start()
+        self.keyboard_listener = None
+        self.mouse_listener = None
+        if listen:
+            from pynput import keyboard, mouse
+
+            self.keyboard_listener = keyboard.Listener(on_press=self.on_keypress)
+            self.mouse_listener = mouse.Listener(
+                on_click=self.on_click,
+                on_move=self.on_move if track_mouse_moves else None,
+            )
+            self.keyboard_listener.start()
+            self.mouse_listener.start()
 
     def on_keypress(self, key):
         self.keyboard_presses += 1
         self.last_keyboard_time = time.time()
+        self.key_times.append(self.clock())
 
     def on_click(self, x, y, button, pressed):
         if pressed:
             self.mouse_clicks += 1
             self.last_mouse_time = time.time()
+            self.click_times.append(self.clock())
+
+    def on_move(self, x, y):
+        # coalesce: keep at most one sample per move_interval
+        now = self.clock()
+        if now - self._last_move_sample >= self.move_interval:
+            self._last_move_sample = now
+            self.move_times.append(now)
+
+    def keys_per_minute(self, window=60.0, now=None):
+        now = self.clock() if now is None else now
+        return self.key_times.count_since(now - window) * 60.0 / window
+
+    def clicks_per_minute(self, window=60.0, now=None):
+        now = self.clock() if now is None else now
+        return self.click_times.count_since(now - window) * 60.0 / window
+
+    def idle_seconds(self, now=None):
+        """
+        Seconds since the last keyboard, mouse click or (sampled) mouse move.
+        Counts from tracker start if there was no input yet.
+        """
+        now = self.clock() if now is None else now
+        last = max(
+            (t for t in (self.key_times.last(), self.click_times.last(), self.move_times.last())
+             if t is not None),
+            default=self._started_at,
+        )
+        return max(0.0, now - last)
+
+    def is_idle(self, threshold, now=None):
+        return self.idle_seconds(now) >= threshold
 
     def get_activity(self):
         return {
             "keyboard_presses": self.keyboard_presses,
             "mouse_clicks": self.mouse_clicks,
             "last_keyboard_time": self.last_keyboard_time,
-            "last_mouse_time": self.last_mouse_time
+            "last_mouse_time": self.last_mouse_time,
+            "keys_per_minute": self.keys_per_minute(),
+            "clicks_per_minute": self.clicks_per_minute(),
+            "idle_seconds": self.idle_seconds(),
         }
@@ -1,6 +1,9 @@
+import math
 import time
+from array import array
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 @dataclass
@@ -12,25 +15,171 @@ class FlowSegment:
 
 @dataclass
 class SessionAnalytics:
+    """
+    Flow segments of one Work session, stored compactly with running totals.
+
+    Segments live in parallel arrays: start/end as float32 offsets from
+    start_time (NaN end = still open) and a 2-byte interned reason code,
+    about 10 bytes per segment. Totals are updated in start_flow/end_flow
+    so summarize_session never has to scan the segments.
+    """
     start_time: float
     end_time: Optional[float] = None
-    flow_segments: List[FlowSegment] = field(default_factory=list)
-    break_events: List[str] = field(default_factory=list)
+
+    # totals over closed segments
+    flow_time: float = field(default=0.0, init=False)
+    longest_streak: float = field(default=0.0, init=False)
+    segment_count: int = field(default=0, init=False)
+    open_start: Optional[float] = field(default=None, init=False)
+
+    # reason code 0 means "no reason" (open segment)
+    reason_names: List[Optional[str]] = field(default_factory=lambda: [None], init=False)
+    reason_totals: List[int] = field(default_factory=lambda: [0], init=False)
+    _reason_codes: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+    _starts: array = field(default_factory=lambda: array("f"), init=False, repr=False)
+    _ends: array = field(default_factory=lambda: array("f"), init=False, repr=False)
+    _reasons: array = field(default_factory=lambda: array("H"), init=False, repr=False)
+
+    def _intern_reason(self, reason: str) -> int:
+        code = self._reason_codes.get(reason)
+        if code is None:
+            code = len(self.reason_names)
+            self._reason_codes[reason] = code
+            self.reason_names.append(reason)
+            self.reason_totals.append(0)
+        return code
 
     def start_flow(self, now: float):
         # avoid starting twice
-        if self.flow_segments and self.flow_segments[-1].end is None:
+        if self.open_start is not None:
             return
-        self.flow_segments.append(FlowSegment(start=now))
+        self.open_start = now
+        self._starts.append(now - self.start_time)
+        self._ends.append(math.nan)
+        self._reasons.append(0)
 
     def end_flow(self, now: float, reason: str):
-        if not self.flow_segments:
+        if self.open_start is None:
             return
-        seg = self.flow_segments[-1]
-        if seg.end is None:
-            seg.end = now
-            seg.break_reason = reason
-            self.break_events.append(reason)
-
-    def finish_session(self):
-        self.end_time = time.time()
+        duration = max(0.0, now - self.open_start)
+        self.open_start = None
+
+        code = self._intern_reason(reason)
+        self._ends[-1] = now - self.start_time
+        self._reasons[-1] = code
+
+        self.flow_time += duration
+        self.longest_streak = max(self.longest_streak, duration)
+        self.segment_count += 1
+        self.reason_totals[code] += 1
+
+    def finish_session(self, now: Optional[float] = None):
+        self.end_time = time.time() if now is None else now
+
+    def segments(self) -> Iterator[Tuple[float, Optional[float], Optional[str]]]:
+        """
+        Yield (start, end, break_reason) in absolute time; end is None if open.
+        """
+        for start, end, code in zip(self._starts, self._ends, self._reasons):
+            yield (
+                self.start_time + start,
+                None if math.isnan(end) else self.start_time + end,
+                self.reason_names[code],
+            )
+
+    @property
+    def flow_segments(self) -> List[FlowSegment]:
+        return [FlowSegment(start, end, reason) for start, end, reason in self.segments()]
+
+    @property
+    def break_events(self) -> List[str]:
+        return [self.reason_names[code] for code in self._reasons if code]
+
+
+@dataclass
+class SessionSummary:
+    total_session: float
+    flow_time: float
+    longest_streak: float
+    focus_ratio: float
+    reason_counts: Counter
+
+
+def summarize_session(a: SessionAnalytics, now: float) -> SessionSummary:
+    """
+    Aggregate flow stats for the Insights popup from the running totals.
+    Open segments / sessions are measured up to `now`.
+    """
+    # Session duration
+    session_end = a.end_time or now
+    total_session = max(0, session_end - a.start_time)
+
+    # Flow stats
+    flow_time = a.flow_time
+    longest_streak = a.longest_streak
+    if a.open_start is not None:
+        open_duration = max(0, now - a.open_start)
+        flow_time += open_duration
+        longest_streak = max(longest_streak, open_duration)
+
+    focus_ratio = (flow_time / total_session * 100) if total_session > 0 else 0.0
+
+    # Break reasons (what ended flow)
+    reason_counts = Counter({
+        a.reason_names[code]: count
+        for code, count in enumerate(a.reason_totals)
+        if code and count
+    })
+
+    return SessionSummary(
+        total_session=total_session,
+        flow_time=flow_time,
+        longest_streak=longest_streak,
+        focus_ratio=focus_ratio,
+        reason_counts=reason_counts,
+    )
+
+
+def flow_break_reason(window_warning_active: bool, inactivity_warning_active: bool) -> str:
+    if window_warning_active:
+        return "Window Switch"
+    if inactivity_warning_active:
+        return "Inactivity"
+    return "Lost Focus"
+
+
+@dataclass
+class FlowTracker:
+    """
+    Turns per-frame flow state into start_flow/end_flow transitions.
+    Shared by the live app and the headless replay tool.
+    """
+    previous_in_flow: bool = False
+
+    def reset(self):
+        self.previous_in_flow = False
+
+    def update(self, analytics: Optional[SessionAnalytics], now: float,
+               is_focus_active: bool, face_detected: bool,
+               window_warning_active: bool = False,
+               inactivity_warning_active: bool = False) -> bool:
+        in_flow = (
+            is_focus_active
+            and face_detected
+            and not window_warning_active
+            and not inactivity_warning_active
+        )
+
+        if analytics:
+            # FLOW OFF -> ON
+            if in_flow and not self.previous_in_flow:
+                analytics.start_flow(now)
+
+            # FLOW ON -> OFF
+            if not in_flow and self.previous_in_flow:
+                reason = flow_break_reason(window_warning_active, inactivity_warning_active)
+                analytics.end_flow(now, reason)
+
+        self.previous_in_flow = in_flow
+        return in_flow
@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from collections import deque
+
+
+class AudioEngine:
+    """
+    Preloaded, non-blocking sound playback.
+
+    `load()` decodes every asset once into a pygame Sound and gives each
+    one its own reserved mixer channel, so alerts never cut each other
+    off. `play()` only drops the name into a small queue and returns; a
+    dispatch thread applies per-sound cooldowns and per-sound rate limits
+    and starts playback, so a repeating alert can never crowd out a
+    different sound. Nothing touches the disk after loading.
+
+    Subclasses can replace the output by overriding `_load_sounds()` and
+    `_start()` (see fakes.RecordingAudioSink).
+    """
+
+    def __init__(self, sounds, cooldowns=None, max_per_minute=20, queue_size=8,
+                 clock=time.monotonic):
+        self.paths = dict(sounds)               # name -> file
+        self.cooldowns = dict(cooldowns or {})  # name -> seconds
+        self.max_per_minute = max_per_minute   # per sound
+        self.clock = clock
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._sounds = {}
+        self._channels = {}
+        self._last_played = {}
+        self._recent = {}                       # name -> deque of play times
+        self._thread = None
+        self.ready = False
+
+        self.played = 0
+        self.suppressed = 0     # cooldown / rate limit
+        self.dropped = 0        # queue full or not loaded
+
+    def load(self):
+        """
+        Initialise the mixer and decode all assets. Call once, off the Tk thread.
+        Sounds that fail to load are skipped; without an audio device
+        nothing is loaded and play() drops every request.
+        """
+        if not self._load_sounds():
+            return
+        self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._thread.start()
+        self.ready = True
+
+    def _load_sounds(self):
+        import pygame
+
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio unavailable: {e}")
+            return False
+        pygame.mixer.set_reserved(len(self.paths))
+        for i, (name, path) in enumerate(self.paths.items()):
+            try:
+                self._sounds[name] = pygame.mixer.Sound(path)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Unable to load sound {path}: {e}. Check assets folder.")
+                continue
+            self._channels[name] = pygame.mixer.Channel(i)
+        return True
+
+    def play(self, name):
+        """
+        Queue a sound; never blocks. Returns False if it was dropped.
+        """
+        if not self.ready or name not in self._sounds:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(name)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def allow(self, name, now):
+        """
+        Cooldown + rate-limit check; records the play if allowed.
+        """
+        last = self._last_played.get(name)
+        if last is not None and now - last < self.cooldowns.get(name, 0.0):
+            return False
+        recent = self._recent.setdefault(name, deque())
+        while recent and now - recent[0] >= 60.0:
+            recent.popleft()
+        if self.max_per_minute and len(recent) >= self.max_per_minute:
+            return False
+        self._last_played[name] = now
+        recent.append(now)
+        return True
+
+    def _dispatch_loop(self):
+        while True:
+            name = self._queue.get()
+            if name is None:
+                return
+            if not self.allow(name, self.clock()):
+                self.suppressed += 1
+                continue
+            self._start(name)
+            self.played += 1
+
+    def _start(self, name):
+        self._channels[name].play(self._sounds[name])
+
+    def stop(self):
+        if self._thread is not None:
+            try:
+                self._queue.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._thread.join(1.0)
+            self._thread = None
+        self.ready = False
+
+    def stats(self):
+        return {"played": self.played, "suppressed": self.suppressed, "dropped": self.dropped}
@@ -0,0 +1,361 @@
+"""
+Benchmarks for the per-frame hot path. Needs no camera or display
+(except --startup, which launches the app).
+
+    python benchmarks.py                    # run and compare against the baseline
+    python benchmarks.py --save-baseline    # store the current numbers as the baseline
+    python benchmarks.py --tolerance 0.25   # flag cases more than 25% slower
+    python benchmarks.py --alloc            # Python allocations per call (tracemalloc)
+    python benchmarks.py --startup          # time-to-first-paint / first-inference of main.py
+
+Exits with status 1 if any case regressed beyond the tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from analytics import SessionAnalytics, FlowTracker, summarize_session
+from focus_detector import (
+    FocusDetector, FOCUS_INDICES, compute_metrics, frame_metrics, gather_focus_points,
+    landmarks_to_array, score_batch,
+    NOSE_TIP, FACE_LEFT, FACE_RIGHT, CHIN,
+    LEFT_EYE_INDICES, RIGHT_EYE_INDICES,
+)
+
+NUM_LANDMARKS = 478
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.20
+PERCENTILES = (50, 90, 99)
+
+
+# ----------------------------------------------------
+# Synthetic landmarks
+# ----------------------------------------------------
+def _place_eye(points, indices, left_x, right_x, y, height):
+    # EAR point order: corner, top, top, corner, bottom, bottom
+    p0, p1, p2, p3, p4, p5 = indices
+    third = (right_x - left_x) / 3.0
+    points[p0, :2] = (left_x, y)
+    points[p3, :2] = (right_x, y)
+    points[p1, :2] = (left_x + third, y - height / 2)
+    points[p2, :2] = (left_x + 2 * third, y - height / 2)
+    points[p5, :2] = (left_x + third, y + height / 2)
+    points[p4, :2] = (left_x + 2 * third, y + height / 2)
+
+
+def synthetic_landmarks(pose="centered", seed=0):
+    """
+    A (478, 3) float32 landmark set for one of: centered, turned, down, eyes_closed.
+    Points the detector does not use are random filler inside the face box.
+    """
+    rng = np.random.default_rng(seed)
+    points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    points[:, 0] = rng.uniform(0.3, 0.7, NUM_LANDMARKS)
+    points[:, 1] = rng.uniform(0.3, 0.8, NUM_LANDMARKS)
+    points[:, 2] = rng.uniform(-0.05, 0.05, NUM_LANDMARKS)
+
+    nose_x = 0.5
+    chin_y = 0.8
+    eye_height = 0.02
+    if pose == "turned":
+        nose_x = 0.58
+    elif pose == "down":
+        chin_y = 0.7
+    elif pose == "eyes_closed":
+        eye_height = 0.004
+    elif pose != "centered":
+        raise ValueError(f"Unknown pose: {pose}")
+
+    points[NOSE_TIP, :2] = (nose_x, 0.5)
+    points[CHIN, :2] = (0.5, chin_y)
+    points[FACE_LEFT, :2] = (0.3, 0.45)
+    points[FACE_RIGHT, :2] = (0.7, 0.45)
+    _place_eye(points, RIGHT_EYE_INDICES, 0.40, 0.46, 0.4, eye_height)
+    _place_eye(points, LEFT_EYE_INDICES, 0.54, 0.60, 0.4, eye_height)
+    return points
+
+
+def as_mediapipe_landmarks(points):
+    """
+    Wrap an array as a list of x/y/z objects, like a mediapipe landmark list.
+    """
+    return [SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in points]
+
+
+POSES = ("centered", "turned", "down", "eyes_closed")
+
+
+# ----------------------------------------------------
+# Timing
+# ----------------------------------------------------
+def time_call(fn, repeat=2000, warmup=50):
+    """
+    Per-call latency percentiles in microseconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(repeat):
+        t0 = clock()
+        fn()
+        samples[i] = clock() - t0
+    values = np.percentile(samples, PERCENTILES) / 1000.0
+    stats = {f"p{p}_us": float(v) for p, v in zip(PERCENTILES, values)}
+    stats["mean_us"] = float(samples.mean() / 1000.0)
+    return stats
+
+
+def allocations_per_call(fn, repeat=200, warmup=20):
+    """
+    Mean peak bytes allocated (and not freed before returning) per call,
+    as seen by tracemalloc. NumPy buffers are included.
+    """
+    for _ in range(warmup):
+        fn()
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(repeat):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / repeat
+
+
+def _make_session(num_segments):
+    a = SessionAnalytics(start_time=0.0)
+    reasons = ("Lost Focus", "Window Switch", "Inactivity")
+    t = 0.0
+    for i in range(num_segments):
+        a.start_flow(t)
+        t += 30.0 + (i % 7)
+        a.end_flow(t, reasons[i % len(reasons)])
+        t += 5.0
+    return a
+
+
+def build_cases():
+    """
+    Return a list of (name, zero-arg callable) benchmark cases.
+    """
+    cases = []
+
+    for pose in POSES:
+        points = synthetic_landmarks(pose)
+        mp_landmarks = as_mediapipe_landmarks(points)
+        cases.append((f"is_unfocused[{pose}]", lambda lm=mp_landmarks: FocusDetector(lm).is_unfocused()))
+
+    points = synthetic_landmarks("centered")
+    mp_landmarks = as_mediapipe_landmarks(points)
+    gathered = points[FOCUS_INDICES, :2]
+    cases += [
+        ("get_head_yaw", lambda: FocusDetector(points).get_head_yaw()),
+        ("is_looking_down", lambda: FocusDetector(points).is_looking_down()),
+        ("is_drowsy", lambda: FocusDetector(points).is_drowsy()),
+        ("compute_metrics", lambda: compute_metrics(gathered)),
+        ("frame_metrics", lambda: frame_metrics(gathered.tolist())),
+        ("gather_focus_points[mediapipe]", lambda: gather_focus_points(mp_landmarks)),
+        ("landmarks_to_array", lambda: landmarks_to_array(mp_landmarks)),
+    ]
+
+    batch = np.stack([synthetic_landmarks(POSES[i % len(POSES)], seed=i) for i in range(256)])
+    cases.append(("score_batch[256]", lambda: score_batch(batch)))
+
+    # Flow transitions: alternate on/off so every call is a real transition
+    session = SessionAnalytics(start_time=0.0)
+    clock = {"t": 0.0}
+
+    def flow_cycle():
+        clock["t"] += 1.0
+        session.start_flow(clock["t"])
+        session.end_flow(clock["t"] + 0.5, "Lost Focus")
+
+    cases.append(("start_flow+end_flow", flow_cycle))
+
+    tracker = FlowTracker()
+    tracker_session = SessionAnalytics(start_time=0.0)
+    state = {"t": 0.0, "face": True}
+
+    def tracker_step():
+        state["t"] += 0.01
+        state["face"] = not state["face"]
+        tracker.update(tracker_session, state["t"], is_focus_active=True, face_detected=state["face"])
+
+    cases.append(("FlowTracker.update", tracker_step))
+
+    for n in (10, 1000):
+        a = _make_session(n)
+        cases.append((f"summarize_session[{n}]", lambda a=a: summarize_session(a, now=1e9)))
+
+    return cases
+
+
+def build_alloc_cases():
+    """
+    (name, callable) cases for the allocation report: the preview path,
+    old style (full-size conversion + new image per frame) vs PreviewRenderer.
+    """
+    import cv2
+    from PIL import Image
+    from preview_renderer import PreviewRenderer
+
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    renderer = PreviewRenderer((360, 270))
+    image = Image.new("RGB", renderer.size)
+
+    def naive_preview():
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        Image.fromarray(rgb).resize(renderer.size)
+
+    def renderer_preview():
+        image.frombytes(renderer.prepare(frame))
+
+    return [
+        ("preview[cvtColor+fromarray]", naive_preview),
+        ("preview[PreviewRenderer]", renderer_preview),
+    ]
+
+
+# ----------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baseline, tolerance, metric="p50_us"):
+    """
+    Names of cases whose `metric` is more than `tolerance` slower than the baseline.
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base or metric not in base:
+            continue
+        if stats[metric] > base[metric] * (1.0 + tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def run(cases, repeat):
+    results = {}
+    for name, fn in cases:
+        results[name] = time_call(fn, repeat=repeat)
+    return results
+
+
+def format_results(results, baseline=None, regressions=()):
+    header = f"{'case':<28}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'vs base':>10}"
+    lines = [header, "-" * len(header)]
+    for name, stats in results.items():
+        delta = ""
+        if baseline and name in baseline:
+            delta = f"{(stats['p50_us'] / baseline[name]['p50_us'] - 1.0) * 100:+.0f}%"
+        flag = "  REGRESSION" if name in regressions else ""
+        lines.append(
+            f"{name:<28}{stats['p50_us']:>10.2f}{stats['p90_us']:>10.2f}"
+            f"{stats['p99_us']:>10.2f}{delta:>10}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def measure_startup(runs=3, timeout=60.0):
+    """
+    Launch main.py with --startup-benchmark and time, from process spawn,
+    each "STARTUP <event>" line it prints (first_paint, first_inference,
+    engine_ready). Returns the median seconds per event.
+    """
+    samples = {}
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "main.py"), "--startup-benchmark"],
+            cwd=HERE, stdout=subprocess.PIPE, text=True,
+        )
+        killer = threading.Timer(timeout, proc.kill)
+        killer.start()
+        try:
+            for line in proc.stdout:
+                if line.startswith("STARTUP "):
+                    event = line.split()[1]
+                    samples.setdefault(event, []).append(time.perf_counter() - t0)
+            proc.wait()
+        finally:
+            killer.cancel()
+    return {event: statistics.median(values) for event, values in samples.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the per-frame hot path.")
+    parser.add_argument("--repeat", type=int, default=2000, help="timed calls per case")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed p50 slowdown vs baseline, as a fraction (default 0.20)")
+    parser.add_argument("--filter", default=None, help="only run cases containing this text")
+    parser.add_argument("--alloc", action="store_true", help="report allocations per call instead of latency")
+    parser.add_argument("--startup", type=int, nargs="?", const=3, default=0, metavar="RUNS",
+                        help="time app start-up over RUNS launches (needs a display and camera)")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        timings = measure_startup(args.startup)
+        if not timings:
+            print("main.py reported no start-up events.")
+            return 1
+        for event, seconds in timings.items():
+            print(f"{event:<32}{seconds * 1000:>10.0f} ms")
+        return 0
+
+    if args.alloc:
+        for name, fn in build_alloc_cases():
+            print(f"{name:<32}{allocations_per_call(fn) / 1024:>10.1f} KiB/call")
+        return 0
+
+    cases = build_cases()
+    if args.filter:
+        cases = [(n, fn) for n, fn in cases if args.filter in n]
+
+    results = run(cases, args.repeat)
+    baseline = load_baseline(args.baseline)
+    regressions = find_regressions(results, baseline, args.tolerance) if baseline else []
+
+    print(format_results(results, baseline, regressions))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("No baseline found; run with --save-baseline to create one.")
+    elif regressions:
+        print(f"{len(regressions)} case(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
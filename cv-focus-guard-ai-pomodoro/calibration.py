@@ -0,0 +1,248 @@
+"""
+Per-user threshold calibration.
+
+    python calibration.py capture calib.npz           # guided, labeled webcam capture
+    python calibration.py fit calib.npz               # sweep thresholds, write thresholds.json
+    python calibration.py fit calib.npz --timeline timeline --hours 24
+
+The labeled capture decides which threshold combinations classify the
+user correctly; an optional recorded timeline (see timeline.py) is used
+to prefer, among equally accurate combinations, the one that raises the
+fewest warnings over a normal day. FocusDetector picks the result up
+at startup through focus_detector.load_thresholds().
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from focus_detector import FOCUS_INDICES, compute_metrics
+
+# Calibration labels; "away" is a head turn in either direction
+LABELS = ("focused", "away", "down", "drowsy")
+FOCUSED, AWAY, DOWN, DROWSY = range(4)
+
+CAPTURE_STEPS = [
+    ("Look at the screen as you normally do while working", FOCUSED, 15.0),
+    ("Look down at your keyboard or desk", DOWN, 6.0),
+    ("Turn your head to the left, away from the screen", AWAY, 5.0),
+    ("Turn your head to the right, away from the screen", AWAY, 5.0),
+    ("Close your eyes (keep your head still)", DROWSY, 5.0),
+    ("Look at the screen again", FOCUSED, 10.0),
+]
+
+RATIO_GRID = np.round(np.linspace(1.2, 3.0, 37), 3)
+PITCH_GRID = np.round(np.linspace(0.40, 0.90, 51), 3)
+EAR_GRID = np.round(np.linspace(0.10, 0.35, 51), 3)
+
+# Which side of each threshold a class needs, per axis (yaw, pitch, ear).
+# "clear" = the condition is not triggered, "flagged" = it is, None = either.
+_CLASS_CONDITIONS = {
+    FOCUSED: ("clear", "clear", "clear"),
+    AWAY: ("flagged", None, None),
+    DOWN: ("clear", "flagged", None),
+    DROWSY: ("clear", "clear", "flagged"),
+}
+
+
+def _bin_indices(metrics, ratio_grid, pitch_grid, ear_grid):
+    """
+    Per frame and axis, the grid position where the condition switches:
+    yaw is clear for ratio_grid[k] with k >= ky; pitch and EAR are clear
+    for grid[k] with k < kp / ke.
+    """
+    yaw = np.asarray(metrics["yaw_ratio"], dtype=np.float64)
+    pitch = np.asarray(metrics["pitch_ratio"], dtype=np.float64)
+    ear = (np.asarray(metrics["left_ear"], dtype=np.float64)
+           + np.asarray(metrics["right_ear"], dtype=np.float64)) / 2.0
+
+    with np.errstate(divide="ignore"):
+        yaw_extent = np.maximum(yaw, 1.0 / yaw)
+    ky = np.searchsorted(ratio_grid, yaw_extent, side="left")
+    kp = np.searchsorted(pitch_grid, pitch, side="right")
+    ke = np.searchsorted(ear_grid, ear, side="right")
+    return ky, kp, ke
+
+
+def _histogram(indices, shape):
+    flat = np.ravel_multi_index(indices, shape)
+    return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+
+def _grid_counts(hist, conditions):
+    """
+    For every threshold combination, how many frames meet `conditions`.
+    Each axis is one cumulative sum over the histogram, so the cost is
+    O(grid size) whatever the number of frames.
+    """
+    out = hist
+    # on the yaw axis "clear" means index <= k; on pitch / EAR it means index > k
+    clear_is_prefix = (True, False, False)
+    for axis, (condition, prefix_clear) in enumerate(zip(conditions, clear_is_prefix)):
+        size = out.shape[axis] - 1
+        if condition is None:
+            out = out.sum(axis=axis, keepdims=True)
+            continue
+        prefix = np.take(np.cumsum(out, axis=axis), np.arange(size), axis=axis)
+        if (condition == "clear") == prefix_clear:
+            out = prefix
+        else:
+            out = out.sum(axis=axis, keepdims=True) - prefix
+    return out
+
+
+def sweep(calibration, day=None, ratio_grid=RATIO_GRID, pitch_grid=PITCH_GRID, ear_grid=EAR_GRID):
+    """
+    Evaluate every (ratio, pitch, ear) threshold combination at once.
+
+    `calibration` has yaw_ratio, pitch_ratio, left_ear, right_ear and
+    label arrays; `day` (optional) has the same metric fields, e.g. a
+    timeline slice. Returns balanced accuracy on the calibration data and
+    the fraction of `day` frames that would raise a warning, both shaped
+    (len(ratio_grid), len(pitch_grid), len(ear_grid)).
+    """
+    grids = (np.asarray(ratio_grid), np.asarray(pitch_grid), np.asarray(ear_grid))
+    shape = tuple(len(g) + 1 for g in grids)
+    grid_shape = tuple(len(g) for g in grids)
+
+    labels = np.asarray(calibration["label"])
+    indices = _bin_indices(calibration, *grids)
+    recalls = []
+    for label, conditions in _CLASS_CONDITIONS.items():
+        mask = labels == label
+        if not mask.any():
+            continue
+        hist = _histogram(tuple(i[mask] for i in indices), shape)
+        recalls.append(np.broadcast_to(_grid_counts(hist, conditions) / mask.sum(), grid_shape))
+    if not recalls:
+        raise ValueError("Calibration data has no labeled frames")
+    balanced_accuracy = np.mean(recalls, axis=0)
+
+    flag_rate = np.zeros(grid_shape)
+    if day is not None and len(day["yaw_ratio"]):
+        hist = _histogram(_bin_indices(day, *grids), shape)
+        clear = _grid_counts(hist, _CLASS_CONDITIONS[FOCUSED])
+        flag_rate = 1.0 - clear / hist.sum()
+
+    return {
+        "ratio_grid": grids[0],
+        "pitch_grid": grids[1],
+        "ear_grid": grids[2],
+        "balanced_accuracy": balanced_accuracy,
+        "flag_rate": flag_rate,
+    }
+
+
+def best_thresholds(result, tolerance=0.01):
+    """
+    Most accurate combination; among those within `tolerance` of the best
+    accuracy, the one with the lowest day-long warning rate.
+    """
+    accuracy = result["balanced_accuracy"]
+    candidates = accuracy >= accuracy.max() - tolerance
+    score = np.where(candidates, result["flag_rate"], np.inf)
+    # equal flag rates: prefer the more accurate one
+    score = score - 1e-9 * accuracy
+    i, j, k = np.unravel_index(np.argmin(score), score.shape)
+    return {
+        "ratio_threshold": float(result["ratio_grid"][i]),
+        "pitch_threshold": float(result["pitch_grid"][j]),
+        "ear_threshold": float(result["ear_grid"][k]),
+        "balanced_accuracy": float(accuracy[i, j, k]),
+        "day_flag_rate": float(result["flag_rate"][i, j, k]),
+    }
+
+
+def capture(camera_index=0, steps=CAPTURE_STEPS, settle=1.5):
+    """
+    Guided capture: prompt for each pose and record raw metrics for it,
+    skipping the first `settle` seconds of every step.
+    """
+    from camera import open_camera
+    from vision import create_face_mesh, detect_landmarks
+
+    cap, _ = open_camera(camera_index)
+    face_mesh = create_face_mesh()
+    rows = []
+    try:
+        for prompt, label, seconds in steps:
+            print(f"{prompt} ({seconds:.0f}s)...", flush=True)
+            start = time.monotonic()
+            while time.monotonic() - start < seconds:
+                ret, frame = cap.read()
+                if not ret or time.monotonic() - start < settle:
+                    continue
+                _, _, landmarks = detect_landmarks(face_mesh, frame)
+                if landmarks is None:
+                    continue
+                rows.append((*compute_metrics(landmarks[FOCUS_INDICES, :2]), label))
+    finally:
+        cap.release()
+        face_mesh.close()
+
+    data = np.array(rows, dtype=np.float64).reshape(-1, 5)
+    return {
+        "yaw_ratio": data[:, 0],
+        "pitch_ratio": data[:, 1],
+        "left_ear": data[:, 2],
+        "right_ear": data[:, 3],
+        "label": data[:, 4].astype(np.int8),
+    }
+
+
+def load_day(timeline_dir, hours=None):
+    from timeline import TimelineReader
+
+    start = time.time() - hours * 3600 if hours else None
+    records = TimelineReader(timeline_dir).read(start=start)
+    return records[(records["face"] == 1) & np.isfinite(records["yaw_ratio"])]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate focus thresholds for one user.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cap_parser = sub.add_parser("capture", help="record a labeled calibration capture")
+    cap_parser.add_argument("output", help="output .npz file")
+    cap_parser.add_argument("--camera", type=int, default=0)
+
+    fit_parser = sub.add_parser("fit", help="sweep thresholds and write them for FocusDetector")
+    fit_parser.add_argument("calibration", help=".npz file from the capture command")
+    fit_parser.add_argument("--timeline", default=None, help="timeline directory with normal-day data")
+    fit_parser.add_argument("--hours", type=float, default=None, help="only the last N hours of the timeline")
+    fit_parser.add_argument("--tolerance", type=float, default=0.01,
+                            help="accuracy given up to lower the warning rate (default 0.01)")
+    fit_parser.add_argument("--out", default="thresholds.json")
+    args = parser.parse_args(argv)
+
+    if args.command == "capture":
+        data = capture(args.camera)
+        np.savez(args.output, **data)
+        counts = {LABELS[i]: int((data["label"] == i).sum()) for i in range(len(LABELS))}
+        print(f"Saved {len(data['label'])} frames to {args.output}: {counts}")
+        return 0
+
+    with np.load(args.calibration) as f:
+        calibration = {name: f[name] for name in f.files}
+    day = load_day(args.timeline, args.hours) if args.timeline else None
+
+    t0 = time.perf_counter()
+    result = sweep(calibration, day)
+    best = best_thresholds(result, args.tolerance)
+    elapsed = time.perf_counter() - t0
+
+    combos = result["balanced_accuracy"].size
+    day_frames = 0 if day is None else len(day)
+    print(f"Swept {combos} combinations over {len(calibration['label'])} labeled "
+          f"+ {day_frames} timeline frames in {elapsed:.2f}s")
+    print(json.dumps(best, indent=2))
+    with open(args.out, "w") as f:
+        json.dump(best, f, indent=2)
+    print(f"Thresholds written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
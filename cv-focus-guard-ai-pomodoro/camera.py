@@ -0,0 +1,152 @@
+"""
+Camera opening with explicit capture settings, plus a probe that measures
+capture-to-verdict latency for several settings on this machine.
+
+    python camera.py                 # probe the default candidates on camera 0
+    python camera.py --camera 1 --seconds 5
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+@dataclass
+class CaptureSettings:
+    width: int = 640
+    height: int = 480
+    fps: float = 30.0
+    fourcc: Optional[str] = "MJPG"   # None keeps the driver's default (usually raw YUYV)
+    buffer_size: int = 1             # driver-side frame queue; 1 = always the newest frame
+
+
+# Tried in order by the probe: small compressed formats first
+CANDIDATES = [
+    CaptureSettings(640, 480, 30.0, "MJPG", 1),
+    CaptureSettings(640, 480, 30.0, None, 1),
+    CaptureSettings(320, 240, 30.0, "MJPG", 1),
+    CaptureSettings(1280, 720, 30.0, "MJPG", 1),
+]
+
+
+def _fourcc_name(value):
+    value = int(value)
+    if value <= 0:
+        return None
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def open_camera(index=0, settings=None):
+    """
+    Open a camera and request `settings`. Drivers silently ignore what
+    they do not support, so the values actually in effect are read back.
+
+    Returns (cap, actual) where actual is a dict with width, height, fps,
+    fourcc and buffer_size as reported by the driver.
+    """
+    settings = settings or CaptureSettings()
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        cap.release()
+        raise RuntimeError(f"Cannot open camera {index}")
+
+    # pixel format first: on V4L2 it limits which sizes / rates are available
+    if settings.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*settings.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.height)
+    cap.set(cv2.CAP_PROP_FPS, settings.fps)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, settings.buffer_size)
+
+    actual = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": _fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+    return cap, actual
+
+
+def describe(actual):
+    return (
+        f"{actual['width']}x{actual['height']} @ {actual['fps']:.0f} FPS "
+        f"{actual['fourcc'] or 'default'} buf={actual['buffer_size']}"
+    )
+
+
+def probe(index=0, candidates=CANDIDATES, seconds=3.0, warmup=1.0):
+    """
+    Run the real capture + Face Mesh pipeline for `seconds` with each
+    candidate and report delivered FPS and capture-to-verdict latency
+    (grab timestamp to finished inference).
+    """
+    from frame_pipeline import FramePipeline, FrameResult
+    from vision import create_face_mesh, detect_landmarks
+
+    face_mesh = create_face_mesh()
+    rows = []
+    for settings in candidates:
+        try:
+            cap, actual = open_camera(index, settings)
+        except RuntimeError as e:
+            print(e)
+            break
+
+        latencies = []
+
+        def infer(frame, captured_at):
+            _, _, landmarks = detect_landmarks(face_mesh, frame)
+            result = FrameResult(frame=frame, face_detected=landmarks is not None,
+                                 captured_at=captured_at, inferred_at=time.monotonic())
+            if captured_at > started + warmup:
+                latencies.append(result.inferred_at - captured_at)
+            return result
+
+        pipeline = FramePipeline(cap, infer)
+        started = time.monotonic()
+        pipeline.start()
+        time.sleep(warmup + seconds)
+        pipeline.stop()
+        stats = pipeline.stats()
+        cap.release()
+
+        lat = np.array(latencies) * 1000.0 if latencies else np.zeros(1)
+        rows.append({
+            "requested": asdict(settings),
+            "actual": actual,
+            "capture_fps": stats["frames_captured"] / (warmup + seconds),
+            "verdicts": len(latencies),
+            "latency_p50_ms": float(np.percentile(lat, 50)),
+            "latency_p95_ms": float(np.percentile(lat, 95)),
+        })
+    face_mesh.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Probe camera settings for capture-to-verdict latency.")
+    parser.add_argument("--camera", type=int, default=0, help="camera index")
+    parser.add_argument("--seconds", type=float, default=3.0, help="measurement time per setting")
+    args = parser.parse_args(argv)
+
+    rows = probe(args.camera, seconds=args.seconds)
+    if not rows:
+        return 1
+    print(f"{'settings':<40}{'cap FPS':>9}{'p50 ms':>9}{'p95 ms':>9}")
+    for row in rows:
+        print(
+            f"{describe(row['actual']):<40}{row['capture_fps']:>9.1f}"
+            f"{row['latency_p50_ms']:>9.1f}{row['latency_p95_ms']:>9.1f}"
+        )
+    best = min(rows, key=lambda r: r["latency_p50_ms"] if r["verdicts"] else float("inf"))
+    print(f"Lowest latency: {describe(best['actual'])} -> set CAPTURE_SETTINGS in settings.py")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,423 @@
+"""
+Out-of-process tracking engine.
+
+    python engine.py                  # run the engine (main.py starts it when USE_TRACKING_ENGINE)
+    python engine.py --watch          # print the published stream of a running engine
+
+Capture, Face Mesh, focus filtering, input / window tracking and flow
+transitions run in this process, so they never share a GIL with the Tk
+GUI; both run the same focus_tracker.FocusTracker and read their
+configuration from settings.py. Display-size preview frames go through
+a SharedFrameRing; everything else is newline-delimited JSON on a Unix
+socket:
+
+  engine -> client   {"type": "hello", "ring": {...}}                    on connect
+                     {"type": "status", "t": ..., "face": ..., "reason": ..., "warning": ...,
+                      "alert": ..., "in_flow": ..., "keys_per_min": ..., ...}
+                     {"type": "flow", "event": "start" | "end", "t": ..., "reason": ...}
+  client -> engine   {"cmd": "mode", "mode": "idle" | "paused" | "break" | "active"}
+                     {"cmd": "stop"}
+
+Any number of local clients can subscribe; the last "mode" received wins.
+"""
+import argparse
+import json
+import os
+import queue
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from inference_scheduler import APP_MODES
+from settings import (
+    THRESHOLDS_FILE, RECORD_TIMELINE,
+    INFERENCE_RATES, INFERENCE_BOOST_SECONDS,
+    DISPLAY_SIZE, OVERLAY_DETAIL, OVERLAY_BUDGET_MS,
+)
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "focusguard-engine.sock")
+
+
+def _encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def _read_lines(conn):
+    """
+    Yield decoded JSON messages from a socket until it closes.
+    """
+    buffer = b""
+    while True:
+        try:
+            data = conn.recv(65536)
+        except OSError:
+            return
+        if not data:
+            return
+        buffer += data
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class _ClientConnection:
+    """
+    One subscriber. Messages go through a bounded queue and a writer
+    thread, so a slow client drops messages instead of stalling the engine.
+    """
+
+    def __init__(self, conn, queue_size=256):
+        self.conn = conn
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.closed = False
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def send(self, data):
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while not self.closed:
+            data = self.queue.get()
+            if data is None:
+                break
+            try:
+                self.conn.sendall(data)
+            except OSError:
+                break
+        self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                self.queue.put_nowait(None)     # wake the writer
+            except queue.Full:
+                pass
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+
+
+class EngineServer:
+    """
+    Unix-socket publisher: broadcasts messages to every connected client
+    and hands client commands to `on_command(message)`.
+    """
+
+    def __init__(self, path, on_command, hello):
+        self.path = path
+        self.on_command = on_command
+        self.hello = hello
+        self.clients = []
+        self._lock = threading.Lock()
+        self._sock = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            self._remove_stale_socket()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        self._sock.listen(8)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _remove_stale_socket(self):
+        """
+        Unlink a socket left by a crashed run, but never one a live engine
+        is still listening on.
+        """
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        except FileNotFoundError:
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A tracking engine is already listening on {self.path}")
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            client = _ClientConnection(conn)
+            client.send(_encode(self.hello()))
+            with self._lock:
+                self.clients.append(client)
+            threading.Thread(target=self._read_loop, args=(client,), daemon=True).start()
+
+    def _read_loop(self, client):
+        for message in _read_lines(client.conn):
+            self.on_command(message)
+        client.close()
+
+    def broadcast(self, message):
+        data = _encode(message)
+        with self._lock:
+            self.clients = [c for c in self.clients if not c.closed]
+            for client in self.clients:
+                client.send(data)
+
+    def stop(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        with self._lock:
+            for client in self.clients:
+                client.close()
+            self.clients = []
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class _FlowPublisher:
+    """
+    Stands in for SessionAnalytics in FlowTracker and publishes the
+    transitions; the GUI applies them to its own session analytics.
+    """
+
+    def __init__(self, server):
+        self.server = server
+
+    def start_flow(self, now):
+        self.server.broadcast({"type": "flow", "event": "start", "t": now})
+
+    def end_flow(self, now, reason):
+        self.server.broadcast({"type": "flow", "event": "end", "t": now, "reason": reason})
+
+
+class TrackingEngine:
+    """
+    Capture + inference + focus state in a process of its own, configured
+    from settings.py like the in-process app.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, thresholds_file=THRESHOLDS_FILE,
+                 status_interval=0.1, poll_interval=0.01, overlay_detail=OVERLAY_DETAIL,
+                 record_timeline=RECORD_TIMELINE, sources=None):
+        self.socket_path = socket_path
+        self.thresholds_file = thresholds_file
+        self.status_interval = status_interval
+        self.poll_interval = poll_interval
+        self.overlay_detail = overlay_detail
+        self.record_timeline = record_timeline
+        # sources.Sources; unset fields are the real camera / Face Mesh / hooks
+        self.sources = sources
+        self.clock = sources.clock if sources is not None else time.monotonic
+
+        self.mode = "idle"
+        self._stop = threading.Event()
+
+    # ----------------------------------------------------
+    # Commands
+    # ----------------------------------------------------
+    def _on_command(self, message):
+        cmd = message.get("cmd")
+        if cmd == "mode" and message.get("mode") in APP_MODES:
+            self.mode = message["mode"]
+        elif cmd == "stop":
+            self._stop.set()
+
+    def is_focus_active(self):
+        return self.mode == "active"
+
+    # ----------------------------------------------------
+    # Main loop
+    # ----------------------------------------------------
+    def run(self):
+        from focus_tracker import FocusTracker, open_capture
+        from frame_pipeline import FramePipeline
+        from inference_scheduler import InferenceScheduler
+        from preview_renderer import PreviewRenderer
+        from shm_ring import SharedFrameRing
+        from sources import Sources
+
+        sources = self.sources or Sources()
+        scheduler = InferenceScheduler(
+            INFERENCE_RATES, boost_seconds=INFERENCE_BOOST_SECONDS, clock=self.clock
+        )
+        renderer = PreviewRenderer(DISPLAY_SIZE)
+        overlay = None
+        if self.overlay_detail != "off":
+            from overlay_renderer import OverlayRenderer
+            overlay = OverlayRenderer(self.overlay_detail, budget_ms=OVERLAY_BUDGET_MS)
+
+        tracker = FocusTracker.create(
+            sources, self.is_focus_active,
+            thresholds_file=self.thresholds_file, record_timeline=self.record_timeline,
+        )
+        try:
+            cap, _ = open_capture(sources)
+        except Exception:
+            tracker.close()
+            raise
+        # shared memory last, once nothing else can fail
+        width, height = DISPLAY_SIZE
+        ring = SharedFrameRing((height, width, 3), slots=3, create=True)
+        server = EngineServer(
+            self.socket_path, self._on_command,
+            hello=lambda: {"type": "hello", "ring": ring.describe(), "pid": os.getpid()},
+        )
+        flow = _FlowPublisher(server)
+        pipeline = FramePipeline(
+            cap, tracker.infer_frame, preview_fn=tracker.preview_frame, scheduler=scheduler,
+            renderer=renderer, overlay=overlay, clock=self.clock,
+        )
+
+        server.start()
+        pipeline.start()
+        print(f"Tracking engine listening on {self.socket_path}", file=sys.stderr, flush=True)
+
+        last_status = 0.0
+        try:
+            while not self._stop.wait(self.poll_interval):
+                scheduler.set_mode(self.mode)
+                result = pipeline.latest()
+                if result is None:
+                    continue
+                if result.preview is not None:
+                    ring.write(result.preview, result.captured_at)
+                state = tracker.update(result, flow)
+
+                now = self.clock()
+                if state.alert or now - last_status >= self.status_interval:
+                    last_status = now
+                    server.broadcast({
+                        "type": "status",
+                        "t": time.time(),
+                        "clock": now,
+                        "mode": self.mode,
+                        "face": state.face,
+                        "reason": state.reason,
+                        "warning": state.warning,
+                        "alert": state.alert,
+                        "in_flow": state.in_flow,
+                        "distracted": state.distracted,
+                        "window_title": state.window_title,
+                        "window_switches": state.window_switches,
+                        "inactive": state.inactive,
+                        "idle_seconds": state.idle_seconds,
+                        "keys_per_min": state.keys_per_min,
+                        "clicks_per_min": state.clicks_per_min,
+                        "inference_fps": scheduler.effective_fps(),
+                        "inference_state": scheduler.current_state(),
+                        "latency_ms": (now - result.captured_at) * 1000.0,
+                        "model_tier": tracker.face_mesh.stats()["tier"],
+                    })
+        finally:
+            pipeline.stop()
+            server.stop()
+            cap.release()
+            ring.close()
+            tracker.close()
+
+
+class EngineClient:
+    """
+    Local subscriber: receives engine messages on a background thread and
+    reads preview frames straight from the engine's shared-memory ring.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET):
+        self.path = path
+        self.ring = None
+        self.engine_pid = None
+        self._sock = None
+        self._messages = queue.SimpleQueue()
+        self.connected = False
+
+    def connect(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+                break
+            except OSError:
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+        self._sock = sock
+        self.connected = True
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _read_loop(self):
+        from shm_ring import SharedFrameRing
+
+        for message in _read_lines(self._sock):
+            if message.get("type") == "hello":
+                self.engine_pid = message.get("pid")
+                self.ring = SharedFrameRing(**message["ring"])
+            self._messages.put(message)
+        self.connected = False
+
+    def poll(self):
+        """
+        All messages received since the last call.
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def send(self, message):
+        if self.connected:
+            try:
+                self._sock.sendall(_encode(message))
+            except OSError:
+                self.connected = False
+
+    def latest_frame(self):
+        return self.ring.read_latest() if self.ring is not None else None
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Focus tracking engine process.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--watch", action="store_true", help="print the stream of a running engine")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        client = EngineClient(args.socket)
+        client.connect()
+        try:
+            while client.connected:
+                for message in client.poll():
+                    print(json.dumps(message), flush=True)
+                time.sleep(0.05)
+        except KeyboardInterrupt:
+            pass
+        client.close()
+        return 0
+
+    TrackingEngine(args.socket).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Scripted stand-ins for the camera, Face Mesh, input hooks, window manager
+and audio output, all driven by one ScriptClock. Used by
+latency_harness.py through sources.Sources.
+
+A script is a list of (time, value) pairs in clock seconds, sorted by
+time; the value holds until the next entry. Face poses are carried in
+the frame itself (a uniform gray level per pose), so the pose a frame was
+captured with survives queueing, mirroring and resizing and reaches
+ScriptedFaceMesh exactly as a real image would reach Face Mesh.
+"""
+import threading
+import time
+from bisect import bisect_right
+from types import SimpleNamespace
+
+import numpy as np
+
+from audio import AudioEngine
+from focus_detector import (
+    CHIN, FACE_LEFT, FACE_RIGHT, LEFT_EYE_INDICES, NOSE_TIP, RIGHT_EYE_INDICES,
+)
+
+POSES = ("absent", "focused", "left", "right", "down", "drowsy")
+# (yaw_ratio, pitch_ratio, EAR) per pose, against the default thresholds
+POSE_METRICS = {
+    "focused": (1.0, 0.9, 0.30),
+    "left": (1 / 3.0, 0.9, 0.30),
+    "right": (3.0, 0.9, 0.30),
+    "down": (1.0, 0.45, 0.30),
+    "drowsy": (1.0, 0.9, 0.12),
+}
+_GRAY_STEP = 40
+N_LANDMARKS = 468
+
+
+def value_at(script, t, default=None):
+    """
+    Value of a (time, value) script at time t.
+    """
+    i = bisect_right(script, t, key=lambda entry: entry[0])
+    return script[i - 1][1] if i else default
+
+
+class ScriptClock:
+    """
+    Monotonic script time: seconds since `epoch` (a time.monotonic()
+    value, so processes can share it) times `speed`. speed > 1 plays a
+    script faster than real time; `sleep()` is in script seconds.
+    """
+
+    def __init__(self, epoch=None, speed=1.0):
+        self.epoch = time.monotonic() if epoch is None else epoch
+        self.speed = speed
+
+    def __call__(self):
+        return (time.monotonic() - self.epoch) * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def sleep_until(self, t):
+        self.sleep(t - self())
+
+
+def pose_landmarks(pose):
+    """
+    (468, 3) landmark array whose FocusDetector metrics are POSE_METRICS[pose].
+    Only the points the detector reads are placed; the rest sit at the nose.
+    """
+    yaw_ratio, pitch_ratio, ear = POSE_METRICS[pose]
+    points = np.full((N_LANDMARKS, 3), 0.5, dtype=np.float32)
+    points[:, 2] = 0.0
+
+    # face 0.4 wide; outer eye corners (also the yaw references) at 0.4 / 0.6,
+    # so |nose - 0.6| / |nose - 0.4| = yaw_ratio
+    points[FACE_LEFT, :2] = (0.3, 0.5)
+    points[FACE_RIGHT, :2] = (0.7, 0.5)
+    nose_x = (0.6 + 0.4 * yaw_ratio) / (1.0 + yaw_ratio)
+    points[NOSE_TIP, :2] = (nose_x, 0.5)
+    points[CHIN, :2] = (nose_x, 0.5 + 0.4 * pitch_ratio)
+
+    # EAR = (2 * 2h) / (2 * width) with eyelid offset h
+    width = 0.08
+    h = ear * width / 2.0
+    for indices, x0 in ((RIGHT_EYE_INDICES, 0.40), (LEFT_EYE_INDICES, 0.52)):
+        p0, p1, p2, p3, p4, p5 = indices
+        points[p0, :2] = (x0, 0.4)
+        points[p3, :2] = (x0 + width, 0.4)
+        points[p1, :2] = points[p5, :2] = (x0 + width / 3, 0.4)
+        points[p2, :2] = points[p4, :2] = (x0 + 2 * width / 3, 0.4)
+        points[p1, 1] -= h
+        points[p2, 1] -= h
+        points[p4, 1] += h
+        points[p5, 1] += h
+    return points
+
+
+class ScriptedCamera:
+    """
+    VideoCapture stand-in: delivers frames at `fps` on the script clock,
+    each filled with the gray level of the pose scripted for its time.
+    """
+
+    def __init__(self, script, clock, fps=30.0, size=(640, 480)):
+        self.script = script
+        self.clock = clock
+        self.interval = 1.0 / fps
+        w, h = size
+        self._frames = {
+            pose: np.full((h, w, 3), _GRAY_STEP * code + _GRAY_STEP // 2, dtype=np.uint8)
+            for code, pose in enumerate(POSES)
+        }
+        self._next = None
+        self._pose = None
+        self.frames_delivered = 0
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        now = self.clock()
+        if self._next is None or self._next < now - self.interval:
+            self._next = now            # first frame, or fell behind: do not burst
+        self.clock.sleep_until(self._next)
+        self._pose = value_at(self.script, self._next, "focused")
+        self._next += self.interval
+        return True
+
+    def retrieve(self):
+        self.frames_delivered += 1
+        return True, self._frames[self._pose].copy()
+
+    def read(self):
+        self.grab()
+        return self.retrieve()
+
+    def release(self):
+        pass
+
+
+class ScriptedFaceMesh:
+    """
+    FaceMesh stand-in: reads the pose from the image and returns its
+    landmarks. `cost_ms` of CPU work per call stands in for the model, so
+    simulated load slows it down the way it slows the real one.
+    """
+
+    def __init__(self, cost_ms=0.0):
+        self.cost = cost_ms / 1000.0
+        self._landmarks = {pose: pose_landmarks(pose) for pose in POSE_METRICS}
+        self._work = np.ones(16384)
+        self.calls = 0
+
+    def process(self, image_rgb):
+        self.calls += 1
+        end = time.perf_counter() + self.cost
+        while time.perf_counter() < end:
+            np.sqrt(self._work, out=self._work)
+        h, w = image_rgb.shape[:2]
+        code = min(int(image_rgb[h // 2, w // 2, 0]) // _GRAY_STEP, len(POSES) - 1)
+        landmarks = self._landmarks.get(POSES[code])
+        if landmarks is None:
+            return SimpleNamespace(multi_face_landmarks=None)
+        return SimpleNamespace(multi_face_landmarks=[SimpleNamespace(landmark=landmarks)])
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {"tier": "scripted", "avg_ms": self.cost * 1000.0, "budget_ms": 0.0, "switches": 0}
+
+
+class ScriptedInput:
+    """
+    Replays a script of "key" / "click" events into an ActivityTracker
+    created with listen=False, on a background thread.
+    """
+
+    def __init__(self, tracker, script, clock):
+        self.tracker = tracker
+        self.script = script
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for t, kind in self.script:
+            self.clock.sleep_until(t)
+            if self._stop.is_set():
+                return
+            if kind == "key":
+                self.tracker.on_keypress(None)
+            elif kind == "click":
+                self.tracker.on_click(0, 0, None, True)
+
+    def stop(self):
+        self._stop.set()
+
+
+class ScriptedWindowTracker:
+    """
+    WindowTracker stand-in: the active window title follows a script.
+    """
+
+    def __init__(self, script, clock):
+        self.script = script
+        self.clock = clock
+        self.last_active_window = None
+        self.last_switch_time = clock()
+
+    def get_active_window(self):
+        return value_at(self.script, self.clock())
+
+    def check_switch(self):
+        current = self.get_active_window()
+        if current != self.last_active_window:
+            self.last_switch_time = self.clock()
+            self.last_active_window = current
+            return current
+        return None
+
+
+class RecordingAudioSink(AudioEngine):
+    """
+    AudioEngine with the same queue, dispatch thread, cooldowns and rate
+    limit, but "playing" a sound appends (clock time, name) to `log`.
+    """
+
+    def __init__(self, sounds, **kwargs):
+        super().__init__(sounds, **kwargs)
+        self.log = []
+
+    def _load_sounds(self):
+        self._sounds = dict.fromkeys(self.paths)
+        return True
+
+    def _start(self, name):
+        self.log.append((self.clock(), name))
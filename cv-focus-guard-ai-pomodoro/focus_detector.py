@@ -1,94 +1,327 @@
+import json
+import math
+from dataclasses import dataclass
+from typing import Optional
+
 import numpy as np
-from scipy.spatial import distance as dist
+
+
+# Landmark indices used by the detector (mediapipe face mesh numbering)
+NOSE_TIP = 1
+LEFT_EYE_CORNER = 263
+RIGHT_EYE_CORNER = 33
+FACE_LEFT = 234
+FACE_RIGHT = 454
+CHIN = 152
+LEFT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
+RIGHT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
+LEFT_EYE_INNER = 362
+RIGHT_EYE_INNER = 133
+# Iris centers, only present with refine_landmarks=True (478 landmarks)
+RIGHT_IRIS_CENTER = 468
+LEFT_IRIS_CENTER = 473
+
+# Everything needed per frame, gathered with a single fancy-index.
+# Positions in this array are fixed, see the _P_* offsets below.
+FOCUS_INDICES = np.array(
+    [NOSE_TIP, LEFT_EYE_CORNER, RIGHT_EYE_CORNER, FACE_LEFT, FACE_RIGHT, CHIN]
+    + LEFT_EYE_INDICES
+    + RIGHT_EYE_INDICES,
+    dtype=np.intp,
+)
+_P_NOSE, _P_LEFT_CORNER, _P_RIGHT_CORNER, _P_FACE_LEFT, _P_FACE_RIGHT, _P_CHIN = range(6)
+_P_LEFT_EYE = slice(6, 12)
+_P_RIGHT_EYE = slice(12, 18)
+_FOCUS_LIST = FOCUS_INDICES.tolist()
+
+DEFAULT_RATIO_THRESHOLD = 1.8
+DEFAULT_PITCH_THRESHOLD = 0.65
+DEFAULT_EAR_THRESHOLD = 0.22
+# EAR reported when the eye width collapses to zero (matches the old behavior)
+EAR_FALLBACK = 0.3
+
+# Reason codes used by the batch API; code 0 means "focused"
+REASON_LABELS = (None, "Looking Left", "Looking Right", "Looking Down", "Drowsy / Sleepy")
+REASON_FOCUSED, REASON_LEFT, REASON_RIGHT, REASON_DOWN, REASON_DROWSY = range(5)
+
+
+def load_thresholds(path):
+    """
+    Per-user thresholds written by calibration.py, as FocusDetector keyword
+    arguments. A missing file or key falls back to the defaults.
+    """
+    thresholds = {
+        "ratio_threshold": DEFAULT_RATIO_THRESHOLD,
+        "pitch_threshold": DEFAULT_PITCH_THRESHOLD,
+        "ear_threshold": DEFAULT_EAR_THRESHOLD,
+    }
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return thresholds
+    except (OSError, ValueError) as e:
+        print(f"Ignoring thresholds file {path}: {e}")
+        return thresholds
+    for key in thresholds:
+        if key in saved:
+            thresholds[key] = float(saved[key])
+    return thresholds
+
+
+def iris_gaze(points):
+    """
+    Horizontal iris position inside the eyes, averaged over both eyes:
+    about 0.5 looking straight ahead, towards 0 or 1 looking sideways.
+    Needs refined (478-point) landmarks; returns None otherwise.
+    """
+    if len(points) <= LEFT_IRIS_CENTER:
+        return None
+    total = 0.0
+    for iris, corner_a, corner_b in ((RIGHT_IRIS_CENTER, RIGHT_EYE_CORNER, RIGHT_EYE_INNER),
+                                     (LEFT_IRIS_CENTER, LEFT_EYE_INNER, LEFT_EYE_CORNER)):
+        lo, hi = sorted((_point(points, corner_a)[0], _point(points, corner_b)[0]))
+        total += (_point(points, iris)[0] - lo) / (hi - lo) if hi > lo else 0.5
+    return total / 2.0
+
+
+def landmarks_to_array(landmarks):
+    """
+    Convert mediapipe landmarks (or an existing array) to an (N, 3) float32 array.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return np.asarray(landmarks, dtype=np.float32)
+    return np.fromiter(
+        (c for lm in landmarks for c in (lm.x, lm.y, lm.z)), dtype=np.float32, count=3 * len(landmarks)
+    ).reshape(-1, 3)
+
+
+def _point(landmarks, index):
+    """
+    (x, y) of one landmark from a mediapipe landmark list or an (N, 3) array.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return float(landmarks[index, 0]), float(landmarks[index, 1])
+    lm = landmarks[index]
+    return lm.x, lm.y
+
+
+def gather_focus_points(landmarks):
+    """
+    Just the FOCUS_INDICES points as a list of (x, y) pairs, without
+    converting the other ~460 landmarks.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks[FOCUS_INDICES, :2].tolist()
+    return [(lm.x, lm.y) for lm in map(landmarks.__getitem__, _FOCUS_LIST)]
+
+
+def _eye_aspect_ratio(eye):
+    # eye: (..., 6, 2) in the usual EAR point order
+    a = np.linalg.norm(eye[..., 1, :] - eye[..., 5, :], axis=-1)
+    b = np.linalg.norm(eye[..., 2, :] - eye[..., 4, :], axis=-1)
+    c = np.linalg.norm(eye[..., 0, :] - eye[..., 3, :], axis=-1)
+    ear = np.divide(a + b, 2.0 * c, out=np.full_like(c, EAR_FALLBACK), where=c != 0)
+    return ear
+
+
+def compute_metrics(points):
+    """
+    Raw metrics from gathered (..., len(FOCUS_INDICES), 2) points.
+    Works on a single frame or a stack of frames.
+
+    Returns (yaw_ratio, pitch_ratio, left_ear, right_ear) where
+    yaw_ratio = |nose - left corner| / |nose - right corner| on x and
+    pitch_ratio = nose-to-chin distance / face width.
+    """
+    nose = points[..., _P_NOSE, :]
+
+    dist_left = np.abs(nose[..., 0] - points[..., _P_LEFT_CORNER, 0])
+    dist_right = np.abs(nose[..., 0] - points[..., _P_RIGHT_CORNER, 0])
+    # dist_right == 0 -> inf if the nose is off-center, 1.0 (center) if both are zero
+    yaw_ratio = np.divide(
+        dist_left, dist_right,
+        out=np.where(dist_left > 0, np.inf, 1.0).astype(np.float32),
+        where=dist_right != 0,
+    )
+
+    face_width = np.linalg.norm(points[..., _P_FACE_LEFT, :] - points[..., _P_FACE_RIGHT, :], axis=-1)
+    nose_to_chin = np.linalg.norm(nose - points[..., _P_CHIN, :], axis=-1)
+    # zero face width -> never "looking down"
+    pitch_ratio = np.divide(
+        nose_to_chin, face_width,
+        out=np.full_like(face_width, np.inf),
+        where=face_width != 0,
+    )
+
+    left_ear = _eye_aspect_ratio(points[..., _P_LEFT_EYE, :])
+    right_ear = _eye_aspect_ratio(points[..., _P_RIGHT_EYE, :])
+
+    return yaw_ratio, pitch_ratio, left_ear, right_ear
+
+
+def _ear(eye):
+    c = math.dist(eye[0], eye[3])
+    if c == 0:
+        return EAR_FALLBACK
+    return (math.dist(eye[1], eye[5]) + math.dist(eye[2], eye[4])) / (2.0 * c)
+
+
+def frame_metrics(xy):
+    """
+    compute_metrics() for a single frame, on gather_focus_points() output.
+    Plain float math: on 18 points NumPy's per-call overhead costs more
+    than the arithmetic.
+    """
+    nose = xy[_P_NOSE]
+    dist_left = abs(nose[0] - xy[_P_LEFT_CORNER][0])
+    dist_right = abs(nose[0] - xy[_P_RIGHT_CORNER][0])
+    if dist_right != 0:
+        yaw_ratio = dist_left / dist_right
+    else:
+        yaw_ratio = math.inf if dist_left > 0 else 1.0
+
+    face_width = math.dist(xy[_P_FACE_LEFT], xy[_P_FACE_RIGHT])
+    nose_to_chin = math.dist(nose, xy[_P_CHIN])
+    pitch_ratio = nose_to_chin / face_width if face_width != 0 else math.inf
+
+    return yaw_ratio, pitch_ratio, _ear(xy[_P_LEFT_EYE]), _ear(xy[_P_RIGHT_EYE])
+
+
+@dataclass
+class FocusMetrics:
+    yaw_ratio: float
+    pitch_ratio: float
+    left_ear: float
+    right_ear: float
+    head_yaw: str
+    looking_down: bool
+    drowsy: bool
+    reason: Optional[str] = None
+    gaze_ratio: Optional[float] = None   # iris position, needs refined landmarks
+
 
 class FocusDetector:
-    def __init__(self, landmarks):
+    def __init__(self, landmarks,
+                 ratio_threshold=DEFAULT_RATIO_THRESHOLD,
+                 pitch_threshold=DEFAULT_PITCH_THRESHOLD,
+                 ear_threshold=DEFAULT_EAR_THRESHOLD,
+                 gaze=False):
         """
-        landmarks: iterable of mediapipe face mesh landmarks
+        landmarks: mediapipe face mesh landmark list, or an (N, 3) array
+        gaze: also compute the iris gaze_ratio (refined landmarks only)
         """
         self.landmarks = landmarks
+        self.gaze = gaze
+        self.ratio_threshold = ratio_threshold
+        self.pitch_threshold = pitch_threshold
+        self.ear_threshold = ear_threshold
+        self._metrics = None
 
-    def _get_landmark_point(self, index):
-        lm = self.landmarks[index]
-        return (lm.x, lm.y)
-
-    def get_head_yaw(self):
+    def evaluate(self) -> FocusMetrics:
         """
-        Roughly estimate if head is turned left/right/center using
-        nose tip and eye corners.
+        Compute every metric and the verdict in one pass over the
+        FOCUS_INDICES points. The result is cached, so repeated calls are free.
         """
-        nose_tip = self._get_landmark_point(1)
-        left_eye_corner = self._get_landmark_point(263)
-        right_eye_corner = self._get_landmark_point(33)
+        if self._metrics is not None:
+            return self._metrics
 
-        dist_nose_to_left = abs(nose_tip[0] - left_eye_corner[0])
-        dist_nose_to_right = abs(nose_tip[0] - right_eye_corner[0])
+        yaw_ratio, pitch_ratio, left_ear, right_ear = frame_metrics(
+            gather_focus_points(self.landmarks)
+        )
 
-        ratio_threshold = 1.8
+        if yaw_ratio > self.ratio_threshold:
+            head_yaw = "Right"
+        elif yaw_ratio * self.ratio_threshold < 1.0:
+            head_yaw = "Left"
+        else:
+            head_yaw = "Center"
+
+        looking_down = pitch_ratio < self.pitch_threshold
+        drowsy = (left_ear + right_ear) / 2.0 < self.ear_threshold
 
-        if dist_nose_to_left > dist_nose_to_right * ratio_threshold:
-            return "Right"
-        elif dist_nose_to_right > dist_nose_to_left * ratio_threshold:
-            return "Left"
+        if head_yaw != "Center":
+            reason = f"Looking {head_yaw}"
+        elif looking_down:
+            reason = "Looking Down"
+        elif drowsy:
+            reason = "Drowsy / Sleepy"
         else:
-            return "Center"
+            reason = None
+
+        self._metrics = FocusMetrics(
+            yaw_ratio=yaw_ratio,
+            pitch_ratio=pitch_ratio,
+            left_ear=left_ear,
+            right_ear=right_ear,
+            head_yaw=head_yaw,
+            looking_down=looking_down,
+            drowsy=drowsy,
+            reason=reason,
+            gaze_ratio=iris_gaze(self.landmarks) if self.gaze else None,
+        )
+        return self._metrics
 
-    def is_looking_down(self, pitch_threshold=0.65):
+    def get_head_yaw(self):
         """
-        Estimate if user is looking down based on nose-chin to face-width ratio.
+        Roughly estimate if head is turned left/right/center using
+        nose tip and eye corners.
         """
-        face_left = self._get_landmark_point(234)
-        face_right = self._get_landmark_point(454)
-        nose_tip = self._get_landmark_point(1)
-        chin = self._get_landmark_point(152)
-
-        face_width = dist.euclidean(face_left, face_right)
-        nose_to_chin_dist = dist.euclidean(nose_tip, chin)
+        return self.evaluate().head_yaw
 
-        if face_width == 0:
-            return False
-
-        ratio = nose_to_chin_dist / face_width
-        return ratio < pitch_threshold
+    def is_looking_down(self, pitch_threshold=None):
+        """
+        Estimate if user is looking down based on nose-chin to face-width ratio.
+        """
+        if pitch_threshold is None:
+            return self.evaluate().looking_down
+        return self.evaluate().pitch_ratio < pitch_threshold
 
     def get_eye_aspect_ratio(self, eye_indices):
-        eye_points = np.array([self._get_landmark_point(i) for i in eye_indices], dtype="float32")
-        A = dist.euclidean(eye_points[1], eye_points[5])
-        B = dist.euclidean(eye_points[2], eye_points[4])
-        C = dist.euclidean(eye_points[0], eye_points[3])
-
-        if C == 0:
-            return 0.3
-
-        ear = (A + B) / (2.0 * C)
-        return ear
+        return _ear([_point(self.landmarks, i) for i in eye_indices])
 
-    def is_drowsy(self, ear_threshold=0.22):
+    def is_drowsy(self, ear_threshold=None):
         """
         Use Eye Aspect Ratio (EAR) to estimate if eyes are mostly closed.
         """
-        LEFT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
-        RIGHT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
-
-        left_ear = self.get_eye_aspect_ratio(LEFT_EYE_INDICES)
-        right_ear = self.get_eye_aspect_ratio(RIGHT_EYE_INDICES)
-
-        avg_ear = (left_ear + right_ear) / 2.0
-
-        return avg_ear < ear_threshold
+        if ear_threshold is None:
+            return self.evaluate().drowsy
+        metrics = self.evaluate()
+        return (metrics.left_ear + metrics.right_ear) / 2.0 < ear_threshold
 
     def is_unfocused(self):
         """
         Return a string reason if user seems unfocused, else None.
         """
-        head_yaw = self.get_head_yaw()
-        if head_yaw != "Center":
-            return f"Looking {head_yaw}"
+        return self.evaluate().reason
 
-        if self.is_looking_down():
-            return "Looking Down"
 
-        if self.is_drowsy():
-            return "Drowsy / Sleepy"
+def score_batch(landmarks,
+                ratio_threshold=DEFAULT_RATIO_THRESHOLD,
+                pitch_threshold=DEFAULT_PITCH_THRESHOLD,
+                ear_threshold=DEFAULT_EAR_THRESHOLD):
+    """
+    Score a (frames, N, 3) landmark array in bulk.
 
-        return None
+    Returns a dict of per-frame arrays: yaw_ratio, pitch_ratio, left_ear,
+    right_ear and reason_code (index into REASON_LABELS, same priority
+    order as FocusDetector.is_unfocused).
+    """
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    points = landmarks[:, FOCUS_INDICES, :2]
+    yaw_ratio, pitch_ratio, left_ear, right_ear = compute_metrics(points)
+
+    reason_code = np.full(len(landmarks), REASON_FOCUSED, dtype=np.int8)
+    # assign lowest priority first so higher priority reasons overwrite it
+    reason_code[(left_ear + right_ear) / 2.0 < ear_threshold] = REASON_DROWSY
+    reason_code[pitch_ratio < pitch_threshold] = REASON_DOWN
+    reason_code[yaw_ratio * ratio_threshold < 1.0] = REASON_LEFT
+    reason_code[yaw_ratio > ratio_threshold] = REASON_RIGHT
+
+    return {
+        "yaw_ratio": yaw_ratio,
+        "pitch_ratio": pitch_ratio,
+        "left_ear": left_ear,
+        "right_ear": right_ear,
+        "reason_code": reason_code,
+    }
@@ -0,0 +1,128 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from focus_detector import DEFAULT_RATIO_THRESHOLD, DEFAULT_PITCH_THRESHOLD, DEFAULT_EAR_THRESHOLD
+
+# Smoothed channels: log(yaw ratio), pitch ratio, mean EAR
+YAW, PITCH, EAR = range(3)
+LOG_YAW_LIMIT = 3.0
+
+
+@dataclass
+class FocusState:
+    reason: Optional[str] = None   # smoothed unfocused reason, None when focused
+    warning: bool = False          # unfocused for at least warning_seconds
+    alert: bool = False            # an alert is due now (fires once per alert_seconds)
+
+
+class FocusFilter:
+    """
+    Time-based, frame-rate independent focus state machine.
+
+    Raw metrics from FocusDetector are smoothed with exponential moving
+    averages whose weight depends on the time between samples (time
+    constant `smoothing_seconds`), so 5 FPS and 60 FPS give the same
+    curve. Thresholds have hysteresis: once a condition is on, it only
+    turns off after the metric moves back past the threshold by the
+    hysteresis margin. Warning and alert delays are in seconds, measured
+    with the monotonic timestamps passed in.
+    """
+
+    def __init__(self, warning_seconds=0.5, alert_seconds=1.5, smoothing_seconds=0.2,
+                 ratio_threshold=DEFAULT_RATIO_THRESHOLD,
+                 pitch_threshold=DEFAULT_PITCH_THRESHOLD,
+                 ear_threshold=DEFAULT_EAR_THRESHOLD,
+                 yaw_hysteresis=0.1, pitch_hysteresis=0.03, ear_hysteresis=0.02,
+                 history=64):
+        self.warning_seconds = warning_seconds
+        self.alert_seconds = alert_seconds
+        self.smoothing_seconds = smoothing_seconds
+
+        self.thresholds = np.array(
+            [math.log(ratio_threshold), pitch_threshold, ear_threshold], dtype=np.float64
+        )
+        self.hysteresis = np.array([yaw_hysteresis, pitch_hysteresis, ear_hysteresis], dtype=np.float64)
+
+        # ring buffer of (timestamp, smoothed yaw, pitch, ear) for inspection
+        self.history = np.zeros((history, 4), dtype=np.float64)
+        self._history_pos = 0
+
+        self._sample = np.zeros(3, dtype=np.float64)
+        self._active = np.zeros(3, dtype=bool)
+        self.reset()
+
+    def reset(self):
+        self.ema = None
+        self.last_sample_time = None
+        self._active[:] = False
+        self.reason = None
+        self.unfocused_since = None
+        self.next_alert = None
+
+    def update(self, now, metrics):
+        """
+        Feed one verdict's raw FocusMetrics, taken at monotonic time `now`.
+        """
+        sample = self._sample
+        with np.errstate(divide="ignore"):
+            sample[YAW] = np.clip(np.log(metrics.yaw_ratio), -LOG_YAW_LIMIT, LOG_YAW_LIMIT)
+        sample[PITCH] = metrics.pitch_ratio
+        sample[EAR] = (metrics.left_ear + metrics.right_ear) / 2.0
+
+        if self.ema is None:
+            self.ema = sample.copy()
+        else:
+            dt = max(0.0, now - self.last_sample_time)
+            alpha = 1.0 - math.exp(-dt / self.smoothing_seconds) if self.smoothing_seconds > 0 else 1.0
+            self.ema += alpha * (sample - self.ema)
+        self.last_sample_time = now
+
+        row = self.history[self._history_pos]
+        row[0] = now
+        row[1:] = self.ema
+        self._history_pos = (self._history_pos + 1) % len(self.history)
+
+        self._apply_thresholds()
+        self._set_reason(now)
+
+    def _apply_thresholds(self):
+        ema, t, h, active = self.ema, self.thresholds, self.hysteresis, self._active
+        # a condition that is already on needs to clear the threshold by the margin to turn off
+        active[YAW] = abs(ema[YAW]) > (t[YAW] - h[YAW] if active[YAW] else t[YAW])
+        active[PITCH] = ema[PITCH] < (t[PITCH] + h[PITCH] if active[PITCH] else t[PITCH])
+        active[EAR] = ema[EAR] < (t[EAR] + h[EAR] if active[EAR] else t[EAR])
+
+    def _set_reason(self, now):
+        # same priority order as FocusDetector.is_unfocused
+        if self._active[YAW]:
+            reason = "Looking Right" if self.ema[YAW] > 0 else "Looking Left"
+        elif self._active[PITCH]:
+            reason = "Looking Down"
+        elif self._active[EAR]:
+            reason = "Drowsy / Sleepy"
+        else:
+            reason = None
+
+        if reason is None:
+            self.unfocused_since = None
+            self.next_alert = None
+        elif self.unfocused_since is None:
+            self.unfocused_since = now
+            self.next_alert = now + self.alert_seconds
+        self.reason = reason
+
+    def poll(self, now):
+        """
+        Current state at monotonic time `now`. Works between samples, so
+        warnings and alerts fire on time even at low inference rates.
+        """
+        if self.unfocused_since is None:
+            return FocusState()
+        warning = now - self.unfocused_since >= self.warning_seconds
+        alert = now >= self.next_alert
+        if alert:
+            self.next_alert = now + self.alert_seconds
+        return FocusState(reason=self.reason, warning=warning, alert=alert)
@@ -0,0 +1,284 @@
+"""
+Focus tracking shared by the in-process app (main.py) and the tracking
+engine process (engine.py): the pipeline's inference / reuse / preview
+callbacks and the per-tick decision (focus filter, inactivity, window
+rules, flow transitions, timeline). Callers only display or publish the
+TrackingState it returns.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from analytics import FlowTracker
+from focus_detector import FocusDetector, load_thresholds
+from focus_filter import FocusFilter
+from frame_pipeline import FrameResult
+from profiler import PROFILER
+from settings import (
+    THRESHOLDS_FILE, RECORD_TIMELINE, TIMELINE_DIR,
+    INACTIVITY_THRESHOLD_SECONDS, TRACK_MOUSE_MOVES,
+    ON_TASK_WINDOWS, DISTRACTING_WINDOWS, WINDOW_POLL_SECONDS,
+    CAMERA_INDEX, CAPTURE_SETTINGS, FACE_MESH_BUDGET_MS, USE_IRIS_GAZE,
+    USE_FACE_ROI, USE_FRAME_GATE, FRAME_GATE_THRESHOLD, FRAME_GATE_MAX_AGE,
+    FOCUS_WARNING_SECONDS, FOCUS_ALERT_SECONDS,
+)
+
+
+@dataclass
+class TrackingState:
+    face: bool                          # the last verdict found a face
+    reason: Optional[str]               # smoothed unfocused reason, None when focused
+    warning: bool
+    alert: bool                         # an alert sound is due now
+    in_flow: bool
+    distracted: bool                    # a distracting window is active
+    window_title: Optional[str]
+    window_switches: int
+    inactive: bool                      # no input for INACTIVITY_THRESHOLD_SECONDS
+    idle_seconds: float
+    keys_per_min: float
+    clicks_per_min: float
+    verdict: Any = None                 # last inferred FrameResult, if any
+
+
+def open_capture(sources):
+    """
+    The camera from `sources`, or the real one opened with CAPTURE_SETTINGS.
+    Returns (cap, capture_info); capture_info is None for a provided camera.
+    """
+    if sources.camera is not None:
+        return sources.camera, None
+    from camera import CaptureSettings, open_camera
+    return open_camera(CAMERA_INDEX, CaptureSettings(**CAPTURE_SETTINGS))
+
+
+class FocusTracker:
+    """
+    Face Mesh + focus state for one camera. `focus_active()` says whether
+    a Work session is running; it is read from the inference worker and
+    from `update()`, which the caller runs once per pipeline result.
+    """
+
+    def __init__(self, face_mesh, activity, windows, thresholds, focus_active,
+                 roi_tracker=None, frame_gate=None, flow_tracker=None, timeline=None,
+                 clock=time.monotonic):
+        self.face_mesh = face_mesh
+        self.activity = activity
+        self.windows = windows
+        self.thresholds = thresholds
+        self.focus_active = focus_active
+        self.roi_tracker = roi_tracker
+        self.frame_gate = frame_gate
+        self.flow_tracker = flow_tracker or FlowTracker()
+        self.timeline = timeline
+        self.clock = clock
+        self.focus_filter = FocusFilter(FOCUS_WARNING_SECONDS, FOCUS_ALERT_SECONDS, **thresholds)
+
+        self.window_switches = 0
+        self.last_inferred = None
+        self._last_landmarks = None
+        self._last_inference = None
+        self._gate_focus_active = False
+
+    @classmethod
+    def create(cls, sources, focus_active, thresholds_file=THRESHOLDS_FILE,
+               record_timeline=RECORD_TIMELINE, flow_tracker=None):
+        """
+        Build from settings.py; any hook set in `sources` is used instead
+        of the real one. The window sampler is started here.
+        """
+        from activity_tracker import ActivityTracker
+        from frame_gate import FrameChangeGate
+        from model_tiers import FaceMeshManager
+        from roi_tracker import RoiTracker
+        from window_tracker import WindowRules, WindowSampler
+
+        face_mesh = sources.face_mesh
+        if face_mesh is None:
+            face_mesh = FaceMeshManager(FACE_MESH_BUDGET_MS)
+            if USE_IRIS_GAZE:
+                face_mesh.request_refined("iris_gaze")
+        activity = sources.activity or ActivityTracker(track_mouse_moves=TRACK_MOUSE_MOVES)
+        windows = WindowSampler(
+            WindowRules(on_task=ON_TASK_WINDOWS, distracting=DISTRACTING_WINDOWS),
+            tracker=sources.window_tracker,
+            poll_interval=WINDOW_POLL_SECONDS,
+        )
+        timeline = None
+        if record_timeline:
+            from timeline import TimelineWriter
+            timeline = TimelineWriter(TIMELINE_DIR)
+        tracker = cls(
+            face_mesh, activity, windows, load_thresholds(thresholds_file), focus_active,
+            roi_tracker=RoiTracker() if USE_FACE_ROI else None,
+            frame_gate=FrameChangeGate(FRAME_GATE_THRESHOLD, FRAME_GATE_MAX_AGE) if USE_FRAME_GATE else None,
+            flow_tracker=flow_tracker, timeline=timeline, clock=sources.clock,
+        )
+        windows.start()
+        return tracker
+
+    def close(self):
+        self.windows.stop()
+        self.face_mesh.close()
+        if self.timeline is not None:
+            self.timeline.close()
+
+    # ----------------------------------------------------
+    # Pipeline callbacks (inference worker)
+    # ----------------------------------------------------
+    def infer_frame(self, frame, captured_at):
+        """
+        Runs on the pipeline's inference worker. Only touches OpenCV /
+        Mediapipe and reads focus_active().
+        """
+        focus_active = self.focus_active()
+        if self.frame_gate is not None:
+            if focus_active != self._gate_focus_active:
+                # verdicts from another state are not reusable
+                self.frame_gate.reset()
+                self._gate_focus_active = focus_active
+            if self._last_inference is not None and self.frame_gate.is_static(frame):
+                return self.reuse_inference(frame, captured_at)
+
+        from vision import detect_landmarks
+        t0 = time.perf_counter()
+        frame, _, landmarks = detect_landmarks(self.face_mesh, frame, self.roi_tracker)
+
+        face_detected = landmarks is not None
+        PROFILER.log_transition(
+            "face", face_detected, "Face detected" if face_detected else "No face detected"
+        )
+
+        metrics = None
+        unfocused_reason = None
+        self._last_landmarks = landmarks
+
+        if face_detected and focus_active:
+            t_detect = time.perf_counter()
+            metrics = FocusDetector(landmarks, gaze=USE_IRIS_GAZE, **self.thresholds).evaluate()
+            PROFILER.record("detection", time.perf_counter() - t_detect)
+            unfocused_reason = metrics.reason
+            PROFILER.log_transition(
+                "reason", unfocused_reason,
+                f"Yaw = {metrics.head_yaw} | Down = {metrics.looking_down} | "
+                f"Drowsy = {metrics.drowsy} | Reason = {unfocused_reason}"
+            )
+
+        result = FrameResult(
+            frame=frame,
+            face_detected=face_detected,
+            landmarks=landmarks,
+            metrics=metrics,
+            unfocused_reason=unfocused_reason,
+            captured_at=captured_at,
+            inferred_at=self.clock(),
+            overlay_landmarks=landmarks if focus_active else None,
+        )
+        if self.frame_gate is not None:
+            self.frame_gate.mark_inferred(time.perf_counter() - t0)
+            self._last_inference = result
+        return result
+
+    def reuse_inference(self, frame, captured_at):
+        """
+        Static scene: pair the new frame with the previous landmarks and verdict.
+        """
+        import cv2
+        previous = self._last_inference
+        return FrameResult(
+            frame=cv2.flip(frame, 1),
+            face_detected=previous.face_detected,
+            landmarks=previous.landmarks,
+            metrics=previous.metrics,
+            unfocused_reason=previous.unfocused_reason,
+            captured_at=captured_at,
+            inferred_at=previous.inferred_at,
+            reused=True,
+            overlay_landmarks=previous.landmarks if self._gate_focus_active else None,
+        )
+
+    def preview_frame(self, frame, captured_at):
+        """
+        Cheap path for frames the scheduler skips: mirror the frame and
+        redraw the last known landmarks so the overlay does not flicker.
+        """
+        import cv2
+        return FrameResult(
+            frame=cv2.flip(frame, 1),
+            face_detected=False,
+            captured_at=captured_at,
+            inferred=False,
+            overlay_landmarks=self._last_landmarks if self.focus_active() else None,
+        )
+
+    # ----------------------------------------------------
+    # Per-result decision (UI / engine loop)
+    # ----------------------------------------------------
+    def update(self, result, analytics=None) -> TrackingState:
+        """
+        Fold one pipeline result into the focus state. Flow transitions go
+        to `analytics` (SessionAnalytics or anything with start_flow /
+        end_flow), inferred results to the timeline.
+        """
+        focus_active = self.focus_active()
+
+        # Preview-only frames carry no verdict: keep using the last inferred one.
+        if result.inferred:
+            self.last_inferred = result
+            if not result.reused:
+                PROFILER.record("verdict_latency", self.clock() - result.captured_at)
+        elif not focus_active:
+            self.last_inferred = None
+        verdict = self.last_inferred
+        face = verdict is not None and verdict.face_detected
+
+        # ---- Inactivity (no keyboard / mouse input) ----
+        idle_seconds = self.activity.idle_seconds()
+        inactive = focus_active and idle_seconds >= INACTIVITY_THRESHOLD_SECONDS
+
+        # ---- Window switches (published by the background sampler) ----
+        self.window_switches += len(self.windows.poll_events())
+        _, window_title, _ = self.windows.current
+        distracted = focus_active and self.windows.is_distracted()
+
+        # ---- Flow detection ----
+        t_flow = time.perf_counter()
+        in_flow = self.flow_tracker.update(
+            analytics, time.time(), is_focus_active=focus_active, face_detected=face,
+            window_warning_active=distracted, inactivity_warning_active=inactive,
+        )
+        PROFILER.record("flow", time.perf_counter() - t_flow)
+
+        # ---- Focus state (time based, frame-rate independent) ----
+        reason, warning, alert = None, False, False
+        if face and focus_active:
+            # preview-only frames carry no new verdict, but timing still advances
+            if result.inferred and verdict.metrics is not None:
+                self.focus_filter.update(verdict.captured_at, verdict.metrics)
+            focus = self.focus_filter.poll(self.clock())
+            reason, warning, alert = focus.reason, focus.warning, focus.alert
+        else:
+            self.focus_filter.reset()
+
+        keys_per_min = self.activity.keys_per_minute()
+        clicks_per_min = self.activity.clicks_per_minute()
+        if self.timeline is not None and result.inferred and not result.reused:
+            self.timeline.append(
+                time.time(), result.metrics, result.face_detected, keys_per_min, clicks_per_min,
+            )
+
+        return TrackingState(
+            face=face,
+            reason=reason,
+            warning=warning,
+            alert=alert,
+            in_flow=in_flow,
+            distracted=distracted,
+            window_title=window_title,
+            window_switches=self.window_switches,
+            inactive=inactive,
+            idle_seconds=idle_seconds,
+            keys_per_min=keys_per_min,
+            clicks_per_min=clicks_per_min,
+            verdict=verdict,
+        )
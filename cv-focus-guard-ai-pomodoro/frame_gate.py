@@ -0,0 +1,83 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameChangeGate:
+    """
+    Skips inference on frames that look the same as the last inferred one.
+
+    Frames are compared as small grayscale thumbnails: if the mean absolute
+    difference is below `threshold` (0-255 gray levels) the caller can reuse
+    the previous landmarks and verdict. A refresh is forced once the last
+    inference is older than `max_age` seconds.
+    """
+
+    def __init__(self, threshold=3.0, max_age=1.0, thumb_size=(64, 48),
+                 ema_alpha=0.05, clock=time.monotonic):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.thumb_size = thumb_size
+        self.ema_alpha = ema_alpha
+        self.clock = clock
+
+        self._gray = None
+        self._thumb = np.zeros((thumb_size[1], thumb_size[0]), dtype=np.uint8)
+        self._reference = np.zeros_like(self._thumb)
+        self._diff = np.zeros_like(self._thumb)
+        self._has_reference = False
+        self._reference_time = 0.0
+
+        self.last_diff = 0.0
+        self.inferred = 0
+        self.skipped = 0
+        self.avg_inference_time = None
+
+    def reset(self):
+        self._has_reference = False
+
+    def is_static(self, frame, now=None):
+        """
+        True if `frame` is close enough to the last inferred frame to reuse its result.
+        """
+        now = self.clock() if now is None else now
+        self._gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        cv2.resize(self._gray, self.thumb_size, dst=self._thumb, interpolation=cv2.INTER_AREA)
+
+        if not self._has_reference or now - self._reference_time >= self.max_age:
+            return False
+
+        cv2.absdiff(self._thumb, self._reference, dst=self._diff)
+        self.last_diff = float(cv2.mean(self._diff)[0])
+        if self.last_diff < self.threshold:
+            self.skipped += 1
+            return True
+        return False
+
+    def mark_inferred(self, seconds, now=None):
+        """
+        Make the frame last passed to is_static() the new reference.
+        `seconds` is how long its inference took.
+        """
+        now = self.clock() if now is None else now
+        self._reference[...] = self._thumb
+        self._has_reference = True
+        self._reference_time = now
+
+        self.inferred += 1
+        a = self.ema_alpha
+        self.avg_inference_time = (
+            seconds if self.avg_inference_time is None
+            else (1 - a) * self.avg_inference_time + a * seconds
+        )
+
+    def stats(self):
+        total = self.inferred + self.skipped
+        return {
+            "skip_ratio": self.skipped / total if total else 0.0,
+            "skipped": self.skipped,
+            "inferred": self.inferred,
+            "last_diff": self.last_diff,
+            "saved_ms": self.skipped * (self.avg_inference_time or 0.0) * 1000,
+        }
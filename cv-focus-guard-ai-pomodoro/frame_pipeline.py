@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from profiler import PROFILER
+
+logger = logging.getLogger(__name__)
+
+# Seconds between logged inference errors; the ones in between are only counted
+ERROR_LOG_INTERVAL = 10.0
+
+
+class DropOldestQueue:
+    """
+    Bounded queue that never blocks the producer: when it is full the
+    oldest item is discarded and counted as dropped.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = deque()
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Return the oldest item, waiting up to `timeout` seconds.
+        Returns None if nothing arrived in time.
+        """
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_latest(self):
+        """
+        Return the newest item without waiting and discard anything older.
+        Returns None if the queue is empty.
+        """
+        with self._cond:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def depth(self):
+        with self._cond:
+            return len(self._items)
+
+
+@dataclass
+class FrameResult:
+    frame: Any                       # annotated BGR frame for the preview
+    face_detected: bool
+    landmarks: Any = None            # (N, 3) landmark array of the first face, if any
+    metrics: Any = None              # FocusMetrics for that face, if evaluated
+    unfocused_reason: Optional[str] = None
+    captured_at: float = 0.0         # monotonic timestamps from the pipeline's clock
+    inferred_at: float = 0.0
+    inferred: bool = True            # False for preview-only frames (inference skipped)
+    reused: bool = False             # verdict reused from an unchanged earlier frame
+    preview: Any = None              # display-size RGB buffer from the preview renderer
+    overlay_landmarks: Any = None    # (N, 3) landmarks to draw on the preview, if any
+
+
+class FramePipeline:
+    """
+    Capture -> inference -> UI pipeline.
+
+    A capture thread grabs camera frames as they arrive (timestamped at
+    grab time, so latency includes any wait in the inference queue) and
+    an inference worker runs `infer_fn(frame)` on the newest one. Both stages hand off
+    through bounded drop-oldest queues, so a slow stage drops frames
+    instead of building up lag. The UI calls `latest()` from the Tk loop
+    and only ever sees the most recent finished result.
+
+    With a `scheduler`, frames it does not want inferred go through the
+    cheap `preview_fn` instead, so the preview keeps moving. With a
+    `renderer`, each result's display buffer is prepared on the worker too,
+    and an `overlay` draws `overlay_landmarks` onto it.
+    """
+
+    def __init__(self, cap, infer_fn: Callable[[Any, float], FrameResult],
+                 preview_fn: Optional[Callable[[Any, float], FrameResult]] = None,
+                 scheduler=None, renderer=None, overlay=None,
+                 capture_queue_size=1, result_queue_size=1, clock=time.monotonic):
+        self.cap = cap
+        self.infer_fn = infer_fn
+        self.preview_fn = preview_fn
+        self.scheduler = scheduler
+        self.renderer = renderer
+        self.overlay = overlay
+        self.clock = clock
+
+        self.capture_queue = DropOldestQueue(capture_queue_size)
+        self.result_queue = DropOldestQueue(result_queue_size)
+
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.frames_reused = 0
+        self.inference_errors = 0
+        self._errors_logged_at = None
+        self._errors_at_last_log = 0
+        self.frames_skipped = 0
+        self.capture_failures = 0
+
+        self._stop = threading.Event()
+        self._capture_thread = None
+        self._inference_thread = None
+
+    def start(self):
+        if self._capture_thread is not None:
+            return
+        self._stop.clear()
+        self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._inference_thread = threading.Thread(target=self._inference_loop, daemon=True)
+        self._capture_thread.start()
+        self._inference_thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        for t in (self._capture_thread, self._inference_thread):
+            if t is not None:
+                t.join(timeout)
+        self._capture_thread = None
+        self._inference_thread = None
+
+    # ----------------------------------------------------
+    # Stages
+    # ----------------------------------------------------
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            ret = self.cap.grab()
+            captured_at = self.clock()
+            if ret:
+                # decode time only; waiting for the camera is not a cost
+                t0 = time.perf_counter()
+                ret, frame = self.cap.retrieve()
+                PROFILER.record("capture", time.perf_counter() - t0)
+            if not ret:
+                self.capture_failures += 1
+                # camera not ready / unplugged: back off instead of spinning
+                time.sleep(0.05)
+                continue
+            self.frames_captured += 1
+            self.capture_queue.put((frame, captured_at))
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            item = self.capture_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            frame, captured_at = item
+            infer = self.scheduler is None or self.scheduler.should_infer()
+            if not infer and self.preview_fn is None:
+                self.frames_skipped += 1
+                continue
+            try:
+                if infer:
+                    result = self.infer_fn(frame, captured_at)
+                else:
+                    result = self.preview_fn(frame, captured_at)
+            except Exception:
+                self.inference_errors += 1
+                self._log_inference_error()
+                continue
+
+            if infer:
+                if result.reused:
+                    self.frames_reused += 1
+                else:
+                    self.frames_inferred += 1
+                if self.scheduler is not None:
+                    self.scheduler.record_inference(
+                        not result.face_detected or result.unfocused_reason is not None,
+                        reused=result.reused,
+                    )
+            else:
+                self.frames_skipped += 1
+            if self.renderer is not None:
+                result.preview = self.renderer.prepare(result.frame)
+                if self.overlay is not None and result.overlay_landmarks is not None:
+                    self.overlay.draw(result.preview, result.overlay_landmarks)
+            self.result_queue.put(result)
+
+    def _log_inference_error(self):
+        """
+        Log the current exception with its traceback, at most once per
+        ERROR_LOG_INTERVAL, so a persistent failure cannot flood the log.
+        """
+        now = time.monotonic()
+        if self._errors_logged_at is not None and now - self._errors_logged_at < ERROR_LOG_INTERVAL:
+            return
+        suppressed = self.inference_errors - self._errors_at_last_log - 1
+        self._errors_logged_at = now
+        self._errors_at_last_log = self.inference_errors
+        if suppressed:
+            logger.exception("Inference error (%d more since the last report)", suppressed)
+        else:
+            logger.exception("Inference error")
+
+    # ----------------------------------------------------
+    # UI side
+    # ----------------------------------------------------
+    def latest(self) -> Optional[FrameResult]:
+        """
+        Newest finished result, or None if nothing new since the last call.
+        """
+        return self.result_queue.get_latest()
+
+    def stats(self):
+        return {
+            "capture_queue_depth": self.capture_queue.depth(),
+            "capture_dropped": self.capture_queue.dropped,
+            "result_queue_depth": self.result_queue.depth(),
+            "result_dropped": self.result_queue.dropped,
+            "frames_captured": self.frames_captured,
+            "frames_inferred": self.frames_inferred,
+            "frames_reused": self.frames_reused,
+            "frames_skipped": self.frames_skipped,
+            "capture_failures": self.capture_failures,
+            "inference_errors": self.inference_errors,
+        }
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque
+
+# Target inferences per second for each scheduler state. 0 disables inference.
+DEFAULT_RATES = {
+    "idle": 0.0,      # timer not started / reset
+    "paused": 0.0,
+    "break": 0.0,     # Short / Long Break
+    "focused": 2.0,   # Work session, user steadily focused
+    "alert": 15.0,    # Work session, user unfocused or recently unfocused
+}
+APP_MODES = ("idle", "paused", "break", "active")
+
+
+class InferenceScheduler:
+    """
+    Decides whether the inference worker should run Face Mesh on the next
+    frame, based on the app state and the most recent focus verdict.
+
+    The app sets the mode ("idle", "paused", "break" or "active") from the
+    Tk thread. In "active" mode the rate is "focused" while the user is
+    steadily focused and "alert" while unfocused / no face, plus
+    `boost_seconds` after an unfocused reason first appears.
+    """
+
+    def __init__(self, rates=None, boost_seconds=5.0, fps_window=3.0, clock=time.monotonic):
+        self.rates = dict(DEFAULT_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.boost_seconds = boost_seconds
+        self.fps_window = fps_window
+        self.clock = clock
+
+        self.mode = "idle"
+        self.unfocused = False
+        self.boost_until = 0.0
+        self.last_inference = None
+
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def set_mode(self, mode):
+        if mode not in APP_MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode != self.mode and mode == "active":
+            # start fresh so the first frame of a session is inferred right away
+            self.unfocused = False
+            self.boost_until = 0.0
+            self.last_inference = None
+        self.mode = mode
+
+    def current_state(self, now=None):
+        if self.mode != "active":
+            return self.mode
+        now = self.clock() if now is None else now
+        if self.unfocused or now < self.boost_until:
+            return "alert"
+        return "focused"
+
+    def current_rate(self, now=None):
+        return self.rates[self.current_state(now)]
+
+    def should_infer(self, now=None):
+        now = self.clock() if now is None else now
+        rate = self.current_rate(now)
+        if rate <= 0:
+            return False
+        if self.last_inference is None:
+            return True
+        return now - self.last_inference >= 1.0 / rate
+
+    def record_inference(self, unfocused, now=None, reused=False):
+        """
+        Called by the inference worker after every scheduled slot.
+        `unfocused` is True when no face was found or a reason was reported.
+        `reused` slots (verdict carried over from an unchanged frame) keep
+        the pacing but do not count towards effective_fps().
+        """
+        now = self.clock() if now is None else now
+        if unfocused and not self.unfocused:
+            self.boost_until = now + self.boost_seconds
+        self.unfocused = unfocused
+        self.last_inference = now
+        if reused:
+            return
+
+        with self._lock:
+            self._recent.append(now)
+            self._trim(now)
+
+    def effective_fps(self, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._trim(now)
+            return len(self._recent) / self.fps_window
+
+    def _trim(self, now):
+        cutoff = now - self.fps_window
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
@@ -0,0 +1,275 @@
+"""
+End-to-end alert latency, headless, under simulated CPU load.
+
+    python latency_harness.py                              # 12 trials, no extra load
+    python latency_harness.py --load 0,2,4 --inference-ms 20 --trials 20
+    python latency_harness.py --json
+
+The tracking engine (engine.py) runs in a child process on the scripted
+sources from fakes.py: a camera showing a scripted sequence of head
+poses, steady typing and a scripted active window, all on one
+ScriptClock. This process plays the GUI: it subscribes to the engine
+socket like main.py does with USE_TRACKING_ENGINE, "shows" a warning when
+a status says so and plays alerts into a RecordingAudioSink that applies
+the app's cooldowns. The script plays in real time, since capture,
+inference and delivery costs do not scale with a faster script clock.
+For every scripted event it reports the time from
+
+    look-away -> warning shown, and alert sound recorded
+    window    -> "Distracted" shown
+
+while `--load N` busy processes compete for the CPU. The configured
+warning / alert delays are the floor; "over" is what capture, inference
+scheduling, smoothing and delivery add on top.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Same alert policy as main.py
+SOUND_FOCUS_ALERT = "assets/focus_alert.mp3"
+SOUND_COOLDOWNS = {SOUND_FOCUS_ALERT: 5.0}
+SOUND_MAX_PER_MINUTE = 12
+UI_POLL_MS = 15
+
+LOOK_AWAY_POSES = ("left", "right", "down", "drowsy")
+ON_TASK_TITLE = "Visual Studio Code"
+DISTRACTING_TITLE = "YouTube - Watch later"
+
+
+def build_scenario(trials, seed=0, lead_in=3.0, away_seconds=2.5, gap=(3.5, 5.0),
+                   window_every=4, typing_interval=0.4):
+    """
+    Scripts for one run: `trials` events separated by random focused gaps.
+    Every `window_every`-th event is a switch to a distracting window, the
+    others a look-away in a random direction. Typing never stops, so
+    inactivity never interferes.
+    """
+    rng = random.Random(seed)
+    faces = [(0.0, "focused")]
+    windows = [(0.0, ON_TASK_TITLE)]
+    events = []
+    t = lead_in
+    for i in range(trials):
+        t += rng.uniform(*gap)
+        if window_every and i % window_every == window_every - 1:
+            windows += [(t, DISTRACTING_TITLE), (t + away_seconds, ON_TASK_TITLE)]
+            events.append({"kind": "window", "detail": DISTRACTING_TITLE, "t": t, "end": t + away_seconds})
+        else:
+            pose = rng.choice(LOOK_AWAY_POSES)
+            faces += [(t, pose), (t + away_seconds, "focused")]
+            events.append({"kind": "look_away", "detail": pose, "t": t, "end": t + away_seconds})
+        t += away_seconds
+    duration = t + 2.0
+    inputs = [(k * typing_interval, "key") for k in range(int(duration / typing_interval) + 1)]
+    return {"faces": faces, "windows": windows, "inputs": inputs, "events": events, "duration": duration}
+
+
+def _run_engine(socket_path, scenario, epoch, inference_ms):
+    """
+    Engine child process (started like main.py starts engine.py, so it has
+    its own shared-memory bookkeeping); the scenario arrives on stdin.
+    """
+    from activity_tracker import ActivityTracker
+    from engine import TrackingEngine
+    from fakes import ScriptClock, ScriptedCamera, ScriptedFaceMesh, ScriptedInput, ScriptedWindowTracker
+    from sources import Sources
+
+    clock = ScriptClock(epoch)
+    activity = ActivityTracker(listen=False, clock=clock)
+    ScriptedInput(activity, scenario["inputs"], clock).start()
+    sources = Sources(
+        camera=ScriptedCamera(scenario["faces"], clock),
+        face_mesh=ScriptedFaceMesh(inference_ms),
+        activity=activity,
+        window_tracker=ScriptedWindowTracker(scenario["windows"], clock),
+        clock=clock,
+    )
+    # thresholds_file="" -> default thresholds, which the scripted poses are built for
+    TrackingEngine(
+        socket_path, thresholds_file="", overlay_detail="off", record_timeline=False, sources=sources,
+    ).run()
+
+
+def _burn(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(10000))
+
+
+def run_level(scenario, load=0, inference_ms=15.0, connect_timeout=30.0):
+    """
+    One run of the scenario with `load` busy processes. Returns the
+    per-event measurements.
+    """
+    from engine import EngineClient
+    from fakes import RecordingAudioSink, ScriptClock
+
+    ctx = mp.get_context("spawn")
+    stop = ctx.Event()
+    burners = [ctx.Process(target=_burn, args=(stop,), daemon=True) for _ in range(load)]
+    for p in burners:
+        p.start()
+
+    socket_path = os.path.join(tempfile.gettempdir(), f"focusguard-harness-{os.getpid()}.sock")
+    epoch = time.monotonic()
+    clock = ScriptClock(epoch)
+    engine = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--engine-child",
+         socket_path, repr(epoch), repr(inference_ms)],
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True,
+    )
+    engine.stdin.write(json.dumps(scenario))
+    engine.stdin.close()
+
+    client = EngineClient(socket_path)
+    sink = RecordingAudioSink(
+        {SOUND_FOCUS_ALERT: SOUND_FOCUS_ALERT}, cooldowns=SOUND_COOLDOWNS,
+        max_per_minute=SOUND_MAX_PER_MINUTE, clock=clock,
+    )
+    warnings, distractions, deliveries = [], [], []
+    try:
+        client.connect(timeout=connect_timeout)
+        connected_at = clock()
+        client.send({"cmd": "mode", "mode": "active"})
+        sink.load()
+
+        warning = distracted = False
+        while clock() < scenario["duration"] and client.connected:
+            for message in client.poll():
+                if message.get("type") != "status":
+                    continue
+                now = clock()
+                deliveries.append(now - message["clock"])
+                if message["warning"] and not warning:
+                    warnings.append(now)
+                if message["distracted"] and not distracted:
+                    distractions.append(now)
+                warning, distracted = message["warning"], message["distracted"]
+                if message["alert"]:
+                    sink.play(SOUND_FOCUS_ALERT)
+            time.sleep(UI_POLL_MS / 1000.0)
+        client.send({"cmd": "stop"})
+    finally:
+        client.close()
+        try:
+            engine.wait(5.0)
+        except subprocess.TimeoutExpired:
+            engine.terminate()
+        stop.set()
+        for p in burners:
+            p.join(2.0)
+        sink.stop()
+
+    alerts = [t for t, _ in sink.log]
+    results = []
+    for event in scenario["events"]:
+        row = dict(event)
+        if event["t"] < connected_at:
+            row["skipped"] = "engine not connected yet"
+        elif event["kind"] == "look_away":
+            row["warning"] = _first_after(warnings, event)
+            row["alert"] = _first_after(alerts, event)
+        else:
+            row["distracted"] = _first_after(distractions, event)
+        results.append(row)
+    return {
+        "load": load,
+        "inference_ms": inference_ms,
+        "events": results,
+        "delivery_ms": 1000.0 * float(np.median(deliveries)) if deliveries else None,
+        "alerts_suppressed": sink.suppressed,
+    }
+
+
+def _first_after(times, event, grace=1.0):
+    """
+    Latency of the first time in [event start, event end + grace), or None.
+    """
+    for t in times:
+        if event["t"] <= t < event["end"] + grace:
+            return t - event["t"]
+    return None
+
+
+def summarize(level):
+    from settings import FOCUS_ALERT_SECONDS, FOCUS_WARNING_SECONDS
+
+    columns = (
+        ("look_away", "warning", "look-away -> warning", FOCUS_WARNING_SECONDS),
+        ("look_away", "alert", "look-away -> alert", FOCUS_ALERT_SECONDS),
+        ("window", "distracted", "window -> distracted", 0.0),
+    )
+    summary = {}
+    for kind, field, label, floor in columns:
+        rows = [e for e in level["events"] if e["kind"] == kind and "skipped" not in e]
+        values = np.array([e[field] for e in rows if e[field] is not None]) * 1000.0
+        summary[label] = {
+            "n": len(values),
+            "missed": len(rows) - len(values),
+            "floor_ms": floor * 1000.0,
+            "p50_ms": float(np.percentile(values, 50)) if len(values) else None,
+            "p95_ms": float(np.percentile(values, 95)) if len(values) else None,
+            "max_ms": float(values.max()) if len(values) else None,
+        }
+    return summary
+
+
+def format_level(level, summary):
+    skipped = sum("skipped" in e for e in level["events"])
+    lines = [
+        f"load {level['load']}, inference {level['inference_ms']:.0f} ms, "
+        f"{len(level['events'])} events ({skipped} before the engine connected)"
+    ]
+    for label, s in summary.items():
+        if s["n"] == 0:
+            lines.append(f"  {label:22s} n=0  missed {s['missed']}")
+            continue
+        lines.append(
+            f"  {label:22s} n={s['n']:<3d} p50 {s['p50_ms']:6.0f} ms  p95 {s['p95_ms']:6.0f} ms  "
+            f"max {s['max_ms']:6.0f} ms  over floor p50 {s['p50_ms'] - s['floor_ms']:5.0f} ms  "
+            f"missed {s['missed']}"
+        )
+    if level["delivery_ms"] is not None:
+        lines.append(f"  engine -> client delivery p50 {level['delivery_ms']:.1f} ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure event-to-alert latency on scripted sources.")
+    parser.add_argument("--trials", type=int, default=12, help="scripted events per run")
+    parser.add_argument("--load", default="0", help="busy processes per run, comma separated (e.g. 0,2,4)")
+    parser.add_argument("--inference-ms", type=float, default=15.0, help="simulated Face Mesh cost per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print per-event results as JSON")
+    parser.add_argument("--engine-child", nargs=3, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.engine_child:
+        socket_path, epoch, inference_ms = args.engine_child
+        _run_engine(socket_path, json.load(sys.stdin), float(epoch), float(inference_ms))
+        return 0
+
+    scenario = build_scenario(args.trials, seed=args.seed)
+    print(f"Scenario: {len(scenario['events'])} events over {scenario['duration']:.0f}s per run", file=sys.stderr)
+    report = []
+    for load in (int(n) for n in args.load.split(",")):
+        level = run_level(scenario, load=load, inference_ms=args.inference_ms)
+        summary = summarize(level)
+        report.append({**level, "summary": summary})
+        if not args.json:
+            print(format_level(level, summary), flush=True)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
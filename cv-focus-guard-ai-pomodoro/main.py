@@ -1,13 +1,21 @@
 import customtkinter as ctk
+import sys
 import threading
 import time
-import pygame
-import cv2
-import mediapipe as mp
-from PIL import Image
-from focus_detector import FocusDetector
-from activity_tracker import ActivityTracker
-from analytics import SessionAnalytics   # Analytics import
+from analytics import SessionAnalytics, FlowTracker, summarize_session   # Analytics import
+from frame_pipeline import FramePipeline
+from inference_scheduler import InferenceScheduler
+from session_store import SessionStore
+from session_timer import CountdownTimer
+from profiler import PROFILER, MetricsExporter
+from audio import AudioEngine
+from sources import Sources
+from settings import (
+    INFERENCE_RATES, INFERENCE_BOOST_SECONDS,
+    DISPLAY_SIZE, OVERLAY_DETAIL, OVERLAY_BUDGET_MS,
+)
+# cv2, mediapipe, pygame, PIL, pynput and pygetwindow are imported by the
+# warm-up thread (see PomodoroTimer._warm_up) so the window shows up first
 
 
 WORK_MIN = 25
@@ -17,16 +25,45 @@ SESSIONS_BEFORE_LONG_BREAK = 4
 
 SOUND_SESSION_END = "assets/session_end.mp3"
 SOUND_FOCUS_ALERT = "assets/focus_alert.mp3"
+# Minimum seconds between two plays of the same sound, and a per-sound cap
+SOUND_COOLDOWNS = {SOUND_SESSION_END: 0.0, SOUND_FOCUS_ALERT: 5.0}
+SOUND_MAX_PER_MINUTE = 12
+
+HISTORY_DB = "focus_history.db"
+# Camera, Face Mesh, focus and input / window tracking settings are in
+# settings.py, shared with the tracking engine process.
+
+# Run capture, Face Mesh and focus tracking in a separate process (engine.py)
+# and use this window as a thin client. The engine is started here unless
+# one is already listening on the socket.
+USE_TRACKING_ENGINE = False
+ENGINE_SOCKET = None            # None = engine.DEFAULT_SOCKET
+ENGINE_START_TIMEOUT = 20.0
+
+# Webcam preview refresh cap (independent of the inference rate)
+DISPLAY_MAX_FPS = 30
+
+# Per-stage timings: dashboard panel, /metrics on localhost (e.g. 9464), text dump
+SHOW_PROFILER_PANEL = True
+PROFILER_PANEL_SECONDS = 1.0
+METRICS_PORT = None
+METRICS_DUMP_PATH = None        # e.g. "focus_metrics.prom"
+METRICS_DUMP_SECONDS = 10.0
 
 COLOR_TEXT = "#FFFFFF"
 COLOR_WARN = "#FFCC00"
 
 
 class PomodoroTimer:
-    def __init__(self, root):
+    def __init__(self, root, startup_benchmark=False, sources=None):
         self.root = root
+        self.startup_benchmark = startup_benchmark
+        # camera / Face Mesh / input / window / audio stand-ins (see fakes.py)
+        self.sources = sources or Sources()
+        self.startup_t0 = time.perf_counter()
+        self.startup_times = {}
         self.root.title("Focus Guard")
-        self.root.geometry("400x700")
+        self.root.geometry("400x830" if SHOW_PROFILER_PANEL else "400x700")
         self.root.resizable(False, False)
 
         self.sessions = 0
@@ -34,40 +71,53 @@ class PomodoroTimer:
         self.is_paused = False
         self.current_time = WORK_MIN * 60
         self.current_session_type = "Work"
-        self.timer_thread = None
+        # Tk `after` ticks read the deadline-based timer; nothing runs while paused
+        self.countdown_timer = CountdownTimer(clock=self.sources.clock)
+        self._tick_job = None
 
         # Analytics tracking
         self.analytics = None
-        self.previous_in_flow = False
-        # Flags used in flow detection logic (placeholders for future features)
+        self.flow_tracker = FlowTracker()
+        self.session_store = SessionStore(HISTORY_DB)
+        # Flags used in flow detection logic
         self.window_warning_active = False
         self.inactivity_warning_active = False
 
-        pygame.mixer.init()
-        self.cap = cv2.VideoCapture(0)
-        self.activity_tracker = ActivityTracker()
-
-        from window_tracker import WindowTracker
-        self.window_tracker = WindowTracker()
-
-        # Face Mesh Model
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+        # Camera, Face Mesh, audio and input hooks are set up by _warm_up()
+        # in the background; until then the timer works without them.
+        self.cap = None
+        self.pipeline = None
+        # focus_tracker.FocusTracker, shared with the engine process
+        self.tracker = None
+        self.window_switches = 0
+        self.audio = self.sources.audio or AudioEngine(
+            {name: name for name in (SOUND_SESSION_END, SOUND_FOCUS_ALERT)},
+            cooldowns=SOUND_COOLDOWNS, max_per_minute=SOUND_MAX_PER_MINUTE,
         )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.drawing_spec = self.mp_drawing.DrawingSpec(
-            thickness=1,
-            circle_radius=1,
-            color=(0, 255, 0)
+        self.engine_ready = False
+        self.engine_error = None
+        self._closing = False
+        # thin-client mode (USE_TRACKING_ENGINE)
+        self.engine_client = None
+        self._engine_process = None
+        self._engine_mode = None
+        self._engine_frame_seq = None
+
+        self.overlay_renderer = None
+        self.preview_renderer = None
+
+        # Capture + inference run off the Tk thread; the UI only renders results
+        self.UI_POLL_MS = 15
+        self.WARM_UP_POLL_MS = 50
+        self.scheduler = InferenceScheduler(
+            INFERENCE_RATES, boost_seconds=INFERENCE_BOOST_SECONDS, clock=self.sources.clock
         )
 
-        self.unfocused_counter = 0
-        self.VISUAL_WARNING_THRESHOLD_FRAMES = 15
-        self.SOUND_ALERT_THRESHOLD_FRAMES = 45
+        self.metrics_exporter = MetricsExporter(
+            PROFILER, port=METRICS_PORT,
+            dump_path=METRICS_DUMP_PATH, dump_interval=METRICS_DUMP_SECONDS,
+        )
+        self._profiler_panel_at = 0.0
 
         # UI
         self.session_label = ctk.CTkLabel(root, text="", font=("Helvetica", 24, "bold"))
@@ -105,7 +155,9 @@ class PomodoroTimer:
         )
         self.insights_button.pack(side="left", padx=4)
 
-        self.webcam_label = ctk.CTkLabel(root, text="")
+        self.webcam_label = ctk.CTkLabel(
+            root, text="Warming up camera...", width=DISPLAY_SIZE[0], height=DISPLAY_SIZE[1]
+        )
         self.webcam_label.pack(pady=10)
 
         # ---------- Simple Live Dashboard ----------
@@ -121,30 +173,161 @@ class PomodoroTimer:
 
         self.focus_state_label = ctk.CTkLabel(
             self.dashboard_frame,
-            text="Focus Status: -",
+            text="Focus Status: Warming up...",
             font=("Helvetica", 14),
         )
         self.focus_state_label.pack(anchor="w", padx=15, pady=2)
 
         self.activity_state_label = ctk.CTkLabel(
             self.dashboard_frame,
-            text="Activity: Keys=0 | Clicks=0",
+            text="Activity: -",
             font=("Helvetica", 14),
         )
-        self.activity_state_label.pack(anchor="w", padx=15, pady=(2, 8))
+        self.activity_state_label.pack(anchor="w", padx=15, pady=2)
+
+        self.pipeline_state_label = ctk.CTkLabel(
+            self.dashboard_frame,
+            text="Pipeline: -",
+            font=("Helvetica", 12),
+        )
+        self.pipeline_state_label.pack(anchor="w", padx=15, pady=2)
+
+        self.inference_state_label = ctk.CTkLabel(
+            self.dashboard_frame,
+            text="Inference: -",
+            font=("Helvetica", 12),
+        )
+        self.inference_state_label.pack(anchor="w", padx=15, pady=(2, 8))
+
+        self.profiler_label = None
+        if SHOW_PROFILER_PANEL:
+            self.profiler_label = ctk.CTkLabel(
+                self.dashboard_frame,
+                text="",
+                font=("Courier", 11),
+                justify="left",
+            )
+            self.profiler_label.pack(anchor="w", padx=15, pady=(0, 8))
 
         self.update_display()
+        self.metrics_exporter.start()
+        self.root.bind("<Map>", self._on_first_paint, add="+")
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        self.root.after(self.WARM_UP_POLL_MS, self._check_warm_up)
+
+    # ----------------------------------------------------
+    # Start-up
+    # ----------------------------------------------------
+    def _mark_startup(self, event):
+        seconds = time.perf_counter() - self.startup_t0
+        self.startup_times[event] = seconds
+        print(f"STARTUP {event} {seconds:.3f}", flush=True)
+
+    def _on_first_paint(self, event):
+        if event.widget is self.root and "first_paint" not in self.startup_times:
+            self._mark_startup("first_paint")
+
+    def _warm_up(self):
+        """
+        Runs on a background thread: heavy imports, audio, input hooks,
+        camera and Face Mesh, plus one inference to initialise the graph.
+        Only builds objects; the Tk thread picks them up in _check_warm_up.
+        """
+        try:
+            self.audio.load()
+
+            if USE_TRACKING_ENGINE:
+                self._connect_engine()
+                self.engine_ready = True
+                return
+
+            from camera import describe
+            from focus_tracker import FocusTracker, open_capture
+            from overlay_renderer import OverlayRenderer
+            from preview_renderer import PreviewRenderer
+            from vision import detect_landmarks
+
+            self.tracker = FocusTracker.create(
+                self.sources, self.is_focus_active, flow_tracker=self.flow_tracker
+            )
+            self.cap, capture_info = open_capture(self.sources)
+            if capture_info is not None:
+                print(f"Camera: {describe(capture_info)}")
+            self.overlay_renderer = OverlayRenderer(OVERLAY_DETAIL, budget_ms=OVERLAY_BUDGET_MS)
+            self.preview_renderer = PreviewRenderer(DISPLAY_SIZE, max_fps=DISPLAY_MAX_FPS)
+
+            # the first Face Mesh call is the slow one; pay it here
+            ret, frame = self.cap.read()
+            if ret:
+                detect_landmarks(self.tracker.face_mesh, frame)
+                self._mark_startup("first_inference")
+
+            self.pipeline = FramePipeline(
+                self.cap, self.tracker.infer_frame,
+                preview_fn=self.tracker.preview_frame,
+                scheduler=self.scheduler,
+                renderer=self.preview_renderer,
+                overlay=self.overlay_renderer,
+                clock=self.sources.clock,
+            )
+            self.engine_ready = True
+        except Exception as e:
+            self.engine_error = e
+
+    def _connect_engine(self):
+        """
+        Thin-client mode: attach to a running tracking engine, or start one
+        and wait for it to listen. The engine reads the same settings.py and
+        runs in this working directory, so relative paths match.
+        """
+        import os
+        import subprocess
+        from engine import DEFAULT_SOCKET, EngineClient
+        from preview_renderer import PreviewRenderer
+
+        path = ENGINE_SOCKET or DEFAULT_SOCKET
+        client = EngineClient(path)
+        try:
+            client.connect(timeout=0.5)
+        except OSError:
+            engine_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine.py")
+            self._engine_process = subprocess.Popen([sys.executable, engine_script, "--socket", path])
+            client.connect(timeout=ENGINE_START_TIMEOUT)
+        self.engine_client = client
+        self.preview_renderer = PreviewRenderer(DISPLAY_SIZE, max_fps=DISPLAY_MAX_FPS)
+        print(f"Connected to tracking engine on {path}")
+
+    def _check_warm_up(self):
+        if self._closing:
+            return
+        if self.engine_error is not None:
+            print(f"Focus tracking unavailable: {self.engine_error}")
+            self.webcam_label.configure(text="Camera unavailable")
+            self.focus_state_label.configure(text="Focus Status: Camera unavailable")
+            if self.startup_benchmark:
+                self.on_closing()
+            return
+        if not self.engine_ready:
+            self.root.after(self.WARM_UP_POLL_MS, self._check_warm_up)
+            return
+
+        self._mark_startup("engine_ready")
+        if self.startup_benchmark:
+            self.on_closing()
+            return
+        self.webcam_label.configure(text="")
+        if self.engine_client is not None:
+            self.update_from_engine()
+            return
+        self.pipeline.start()
         self.update_webcam()
 
     # ----------------------------------------------------
     # Sound
     # ----------------------------------------------------
     def play_sound(self, sound_file):
-        try:
-            pygame.mixer.music.load(sound_file)
-            pygame.mixer.music.play()
-        except pygame.error as e:
-            print(f"Unable to play sound: {e}. Check assets folder.")
+        # queued for the audio thread; never blocks or reads the disk
+        self.audio.play(sound_file)
 
     # ----------------------------------------------------
     # Timer Logic
@@ -157,15 +340,33 @@ class PomodoroTimer:
         )
 
     def countdown(self):
-        while self.is_running and self.current_time > 0:
-            if not self.is_paused:
-                self.current_time -= 1
-                self.root.after(0, self.update_display)
-                time.sleep(1)
+        """
+        One timer tick on the Tk thread. Remaining time comes from the
+        monotonic deadline, and the next tick is scheduled for the moment
+        the displayed second changes.
+        """
+        self._tick_job = None
+        if not self.is_running or self.is_paused:
+            return
+
+        self.current_time = self.countdown_timer.remaining_seconds()
+        self.update_display()
 
-        if self.is_running and self.current_time == 0:
+        if self.countdown_timer.expired():
+            self.countdown_timer.stop()
             self.play_sound(SOUND_SESSION_END)
-            self.root.after(0, self.next_session)
+            self.next_session()
+            return
+        self._schedule_tick()
+
+    def _schedule_tick(self):
+        self._cancel_tick()
+        self._tick_job = self.root.after(self.countdown_timer.next_tick_delay_ms(), self.countdown)
+
+    def _cancel_tick(self):
+        if self._tick_job is not None:
+            self.root.after_cancel(self._tick_job)
+            self._tick_job = None
 
     def start_timer(self):
         if not self.is_running:
@@ -174,20 +375,37 @@ class PomodoroTimer:
             # Start analytics if this is a Work session
             if self.current_session_type == "Work":
                 self.analytics = SessionAnalytics(start_time=time.time())
-                self.previous_in_flow = False
+                self.flow_tracker.reset()
 
             self.start_button.configure(state="disabled")
             self.pause_button.configure(state="normal")
-            self.timer_thread = threading.Thread(target=self.countdown, daemon=True)
-            self.timer_thread.start()
+            self.countdown_timer.start(self.current_time)
+            self._schedule_tick()
 
     def pause_timer(self):
         self.is_paused = not self.is_paused
         self.pause_button.configure(text="Resume" if self.is_paused else "Pause")
+        if self.is_paused:
+            self.countdown_timer.pause()
+            self._cancel_tick()
+        else:
+            self.countdown_timer.resume()
+            self.countdown()
+
+    def finish_analytics(self):
+        """
+        Close the current Work session's analytics and queue it for the
+        history store. Sessions that are already finished are left alone.
+        """
+        if self.analytics and self.analytics.end_time is None:
+            self.analytics.finish_session()
+            self.session_store.save_session(self.analytics)
 
     def reset_timer(self):
         self.is_running = False
         self.is_paused = False
+        self.countdown_timer.stop()
+        self._cancel_tick()
         self.sessions = 0
         self.current_session_type = "Work"
         self.current_time = WORK_MIN * 60
@@ -195,19 +413,18 @@ class PomodoroTimer:
         self.start_button.configure(state="normal")
         self.pause_button.configure(state="disabled", text="Pause")
         self.unfocused_reason_label.configure(text="")
-        self.unfocused_counter = 0
 
         # Finish analytics if a session was running
         if self.analytics:
-            self.analytics.finish_session()
+            self.finish_analytics()
             self.analytics = None
-            self.previous_in_flow = False
+            self.flow_tracker.reset()
 
     def next_session(self):
         if self.current_session_type == "Work":
             # Work session just finished, close analytics session
             if self.analytics:
-                self.analytics.finish_session()
+                self.finish_analytics()
                 # keep analytics object so Insights can read it
 
             self.sessions += 1
@@ -220,125 +437,210 @@ class PomodoroTimer:
         else:
             self.current_session_type = "Work"
             self.current_time = WORK_MIN * 60
+            # each Work session gets its own analytics (and history record)
+            self.analytics = SessionAnalytics(start_time=time.time())
+            self.flow_tracker.reset()
 
         self.is_paused = False
+        self.pause_button.configure(text="Pause")
         self.update_display()
-        self.timer_thread = threading.Thread(target=self.countdown, daemon=True)
-        self.timer_thread.start()
+        self.countdown_timer.start(self.current_time)
+        self._schedule_tick()
 
     # ----------------------------------------------------
     # Webcam + Focus Detection + Flow Tracking + Dashboard
     # ----------------------------------------------------
+    def is_focus_active(self):
+        return self.current_session_type == "Work" and self.is_running and not self.is_paused
+
+    def inference_mode(self):
+        if not self.is_running:
+            return "idle"
+        if self.is_paused:
+            return "paused"
+        if self.current_session_type != "Work":
+            return "break"
+        return "active"
+
+    def focus_state_text(self, face_detected, window_title, idle_seconds, unfocused_reason):
+        if not self.is_running or self.current_session_type != "Work":
+            return "Idle (Break / Not running)"
+        if self.is_paused:
+            return "Paused"
+        if not face_detected:
+            return "No face detected"
+        if self.window_warning_active:
+            return f"Distracted: {window_title[:30]}"
+        if self.inactivity_warning_active:
+            return f"Inactive: no input for {idle_seconds:.0f}s"
+        if unfocused_reason:
+            return f"Unfocused: {unfocused_reason}"
+        return "Focused"
+
     def update_webcam(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            self.root.after(10, self.update_webcam)
+        """
+        UI consumer: renders the latest finished pipeline result, if any.
+        """
+        self.scheduler.set_mode(self.inference_mode())
+
+        result = self.pipeline.latest()
+        if result is None:
+            self.root.after(self.UI_POLL_MS, self.update_webcam)
             return
 
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(frame_rgb)
+        state = self.tracker.update(result, self.analytics)
+        self.window_warning_active = state.distracted
+        self.inactivity_warning_active = state.inactive
+        self.window_switches = state.window_switches
+        verdict = state.verdict
 
-        face_detected = results.multi_face_landmarks is not None
-        print("Face detected" if face_detected else "No face detected")
+        if state.warning:
+            self.unfocused_reason_label.configure(text=f"Warning: {state.reason}")
+        else:
+            self.unfocused_reason_label.configure(text="")
+        if state.alert:
+            self.play_sound(SOUND_FOCUS_ALERT)
 
-        is_focus_active = (
-            self.current_session_type == "Work" and self.is_running and not self.is_paused
+        self.activity_state_label.configure(
+            text=(
+                f"Activity: {state.keys_per_min:.0f} keys/min | "
+                f"{state.clicks_per_min:.0f} clicks/min | idle {state.idle_seconds:.0f}s | "
+                f"{self.window_switches} window switches"
+            )
         )
 
-        # ---- Flow detection ----
-        in_flow = (
-            is_focus_active
-            and face_detected
-            and not self.window_warning_active
-            and not self.inactivity_warning_active
+        # ---- Focus Status text for dashboard ----
+        focus_state = self.focus_state_text(
+            state.face, state.window_title, state.idle_seconds, state.reason
         )
+        self.focus_state_label.configure(text=f"Focus Status: {focus_state}")
 
-        now = time.time()
-
-        if self.analytics:
-            # FLOW OFF -> ON
-            if in_flow and not self.previous_in_flow:
-                self.analytics.start_flow(now)
-
-            # FLOW ON -> OFF
-            if not in_flow and self.previous_in_flow:
-                reason = "Unknown"
-                if self.window_warning_active:
-                    reason = "Window Switch"
-                elif self.inactivity_warning_active:
-                    reason = "Inactivity"
-                else:
-                    reason = "Lost Focus"
-                self.analytics.end_flow(now, reason)
-
-        self.previous_in_flow = in_flow
-
-        # ---- Focus detection UI / sound (existing behavior) ----
-        unfocused_reason = None  # default so we can use it for dashboard later
-
-        if results.multi_face_landmarks and is_focus_active:
-            for face_landmarks in results.multi_face_landmarks:
-                self.mp_drawing.draw_landmarks(
-                    image=frame,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.drawing_spec
-                )
-
-            detector = FocusDetector(results.multi_face_landmarks[0].landmark)
-            unfocused_reason = detector.is_unfocused()
-            print(
-                "Yaw =", detector.get_head_yaw(),
-                "| Down =", detector.is_looking_down(),
-                "| Drowsy =", detector.is_drowsy(),
-                "| Reason =", unfocused_reason
+        stats = self.pipeline.stats()
+        self.pipeline_state_label.configure(
+            text=(
+                f"Pipeline: capture q={stats['capture_queue_depth']} "
+                f"drop={stats['capture_dropped']} | "
+                f"result q={stats['result_queue_depth']} "
+                f"drop={stats['result_dropped']}"
+            )
+        )
+        inference_text = (
+            f"Inference: {self.scheduler.effective_fps():.1f} FPS "
+            f"({self.scheduler.current_state()})"
+        )
+        tier = self.tracker.face_mesh.stats()
+        inference_text += f" | model {tier['tier']} {tier['avg_ms']:.0f}/{tier['budget_ms']:.0f} ms"
+        if verdict is not None and verdict.metrics is not None and verdict.metrics.gaze_ratio is not None:
+            inference_text += f" | gaze {verdict.metrics.gaze_ratio:.2f}"
+        if self.tracker.roi_tracker:
+            roi = self.tracker.roi_tracker.stats()
+            inference_text += (
+                f" | ROI hit {roi['hit_rate'] * 100:.0f}% "
+                f"{roi['avg_roi_ms']:.0f}/{roi['avg_full_ms']:.0f} ms "
+                f"saved {roi['saved_ms'] / 1000:.1f}s"
+            )
+        if self.tracker.frame_gate:
+            gate = self.tracker.frame_gate.stats()
+            inference_text += (
+                f" | static skip {gate['skip_ratio'] * 100:.0f}% "
+                f"saved {gate['saved_ms'] / 1000:.1f}s"
             )
+        self.inference_state_label.configure(text=inference_text)
 
-            if unfocused_reason:
-                self.unfocused_counter += 1
+        now = self.sources.clock()
+        if self.profiler_label is not None and now - self._profiler_panel_at >= PROFILER_PANEL_SECONDS:
+            self._profiler_panel_at = now
+            self.profiler_label.configure(text=PROFILER.summary_text())
 
-                if self.unfocused_counter > self.VISUAL_WARNING_THRESHOLD_FRAMES:
-                    self.unfocused_reason_label.configure(text=f"Warning: {unfocused_reason}")
+        # ---- Show webcam frame ----
+        if result.preview is not None and self.preview_renderer.due():
+            t_render = time.perf_counter()
+            self.preview_renderer.render(self.webcam_label, result.preview)
+            PROFILER.record("render", time.perf_counter() - t_render)
+
+        self.root.after(self.UI_POLL_MS, self.update_webcam)
 
-                if self.unfocused_counter > self.SOUND_ALERT_THRESHOLD_FRAMES:
+    def update_from_engine(self):
+        """
+        Thin-client counterpart of update_webcam: the engine process does
+        capture, inference, input / window tracking and focus state; this
+        applies its messages and shows its newest shared-memory frame.
+        """
+        client = self.engine_client
+        mode = self.inference_mode()
+        if mode != self._engine_mode:
+            client.send({"cmd": "mode", "mode": mode})
+            self._engine_mode = mode
+
+        status = None
+        for message in client.poll():
+            kind = message.get("type")
+            if kind == "flow":
+                # same transitions FlowTracker makes in-process
+                if self.analytics and message["event"] == "start":
+                    self.analytics.start_flow(message["t"])
+                elif self.analytics:
+                    self.analytics.end_flow(message["t"], message["reason"])
+            elif kind == "status":
+                status = message
+                if status["alert"]:
                     self.play_sound(SOUND_FOCUS_ALERT)
-                    self.unfocused_counter = 0
-            else:
-                self.unfocused_counter = 0
-                self.unfocused_reason_label.configure(text="")
-        else:
-            self.unfocused_counter = 0
+
+        if not client.connected:
+            self.focus_state_label.configure(text="Focus Status: Tracking engine stopped")
             self.unfocused_reason_label.configure(text="")
+            return
 
-        # ---- Activity tracking for dashboard ----
-        activity = self.activity_tracker.get_activity()
-        keyboard_presses = activity.get("keyboard_presses", 0)
-        mouse_clicks = activity.get("mouse_clicks", 0)
+        if status is not None:
+            self.show_engine_status(status)
 
-        self.activity_state_label.configure(
-            text=f"Activity: Keys={keyboard_presses} | Clicks={mouse_clicks}"
-        )
+        latest = client.latest_frame()
+        if latest is not None and latest[0] != self._engine_frame_seq and self.preview_renderer.due():
+            seq, _, rgb = latest
+            t_render = time.perf_counter()
+            self.preview_renderer.render(self.webcam_label, rgb)
+            PROFILER.record("render", time.perf_counter() - t_render)
+            # overwritten while copying: draw it again from the next slot
+            self._engine_frame_seq = seq if client.ring.is_current(seq) else None
 
-        # ---- Focus Status text for dashboard ----
-        if not self.is_running or self.current_session_type != "Work":
-            focus_state = "Idle (Break / Not running)"
-        elif not face_detected:
-            focus_state = "No face detected"
-        elif unfocused_reason:
-            focus_state = f"Unfocused: {unfocused_reason}"
-        else:
-            focus_state = "Focused"
+        now = self.sources.clock()
+        if self.profiler_label is not None and now - self._profiler_panel_at >= PROFILER_PANEL_SECONDS:
+            self._profiler_panel_at = now
+            self.profiler_label.configure(text=PROFILER.summary_text())
 
-        self.focus_state_label.configure(text=f"Focus Status: {focus_state}")
+        self.root.after(self.UI_POLL_MS, self.update_from_engine)
 
-        # ---- Show webcam frame ----
-        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(360, 270))
-        self.webcam_label.configure(image=ctk_img)
+    def show_engine_status(self, status):
+        self.window_warning_active = status["distracted"]
+        self.inactivity_warning_active = status["inactive"]
+        self.window_switches = status["window_switches"]
 
-        self.root.after(10, self.update_webcam)
+        if status["warning"] and status["reason"]:
+            self.unfocused_reason_label.configure(text=f"Warning: {status['reason']}")
+        else:
+            self.unfocused_reason_label.configure(text="")
+
+        self.activity_state_label.configure(
+            text=(
+                f"Activity: {status['keys_per_min']:.0f} keys/min | "
+                f"{status['clicks_per_min']:.0f} clicks/min | idle {status['idle_seconds']:.0f}s | "
+                f"{self.window_switches} window switches"
+            )
+        )
+        focus_state = self.focus_state_text(
+            status["face"], status["window_title"], status["idle_seconds"], status["reason"]
+        )
+        self.focus_state_label.configure(text=f"Focus Status: {focus_state}")
+        self.pipeline_state_label.configure(
+            text=f"Pipeline: tracking engine (pid {self.engine_client.engine_pid}) | "
+                 f"frame age {status['latency_ms']:.0f} ms"
+        )
+        self.inference_state_label.configure(
+            text=(
+                f"Inference: {status['inference_fps']:.1f} FPS "
+                f"({status['inference_state']}) | model {status['model_tier']}"
+            )
+        )
 
     # ----------------------------------------------------
     # Insights popup (basic flow analytics + suggestions)
@@ -359,31 +661,12 @@ class PomodoroTimer:
             ).pack(padx=20, pady=20)
             return
 
-        a = self.analytics
-        now = time.time()
-
-        # Session duration
-        session_end = a.end_time or now
-        total_session = max(0, session_end - a.start_time)
-
-        # Flow stats
-        flow_time = 0.0
-        longest_streak = 0.0
-        for seg in a.flow_segments:
-            seg_end = seg.end or now
-            duration = max(0, seg_end - seg.start)
-            flow_time += duration
-            if duration > longest_streak:
-                longest_streak = duration
-
-        focus_ratio = (flow_time / total_session * 100) if total_session > 0 else 0.0
-
-        # Break reasons (what ended flow)
-        from collections import Counter
-        break_reasons = [
-            seg.break_reason for seg in a.flow_segments if seg.break_reason
-        ]
-        reason_counts = Counter(break_reasons)
+        summary = summarize_session(self.analytics, time.time())
+        total_session = summary.total_session
+        flow_time = summary.flow_time
+        longest_streak = summary.longest_streak
+        focus_ratio = summary.focus_ratio
+        reason_counts = summary.reason_counts
 
         # ---- Build popup window ----
         win = ctk.CTkToplevel(self.root)
@@ -403,6 +686,12 @@ class PomodoroTimer:
             f"Longest Flow Streak : {longest_streak/60:.1f} min\n"
             f"Focus Ratio         : {focus_ratio:.1f}%"
         )
+        history = self.session_store.daily_focus(days=7)
+        if history:
+            week_work = sum(work for _, work, _, _ in history)
+            week_flow = sum(flow for _, _, flow, _ in history)
+            week_ratio = (week_flow / week_work * 100) if week_work > 0 else 0.0
+            summary_text += f"\nLast 7 Days         : {week_ratio:.1f}% over {len(history)} day(s)"
         ctk.CTkLabel(
             win,
             text=summary_text,
@@ -516,10 +805,30 @@ class PomodoroTimer:
 
         # finalize analytics if running
         if self.analytics:
-            self.analytics.finish_session()
+            self.finish_analytics()
             self.analytics = None
 
-        self.cap.release()
+        self._closing = True
+        self._cancel_tick()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        if self.engine_client is not None:
+            # an engine started by this window goes away with it
+            if self._engine_process is not None:
+                self.engine_client.send({"cmd": "stop"})
+            self.engine_client.close()
+        if self._engine_process is not None:
+            try:
+                self._engine_process.wait(timeout=3.0)
+            except Exception:
+                self._engine_process.terminate()
+        self.metrics_exporter.stop()
+        self.audio.stop()
+        if self.tracker is not None:
+            self.tracker.close()
+        self.session_store.close()
+        if self.cap is not None:
+            self.cap.release()
         self.root.destroy()
 
 
@@ -528,6 +837,7 @@ if __name__ == "__main__":
     ctk.set_default_color_theme("blue")
 
     root = ctk.CTk()
-    app = PomodoroTimer(root)
+    # --startup-benchmark: report start-up timings and exit once warmed up
+    app = PomodoroTimer(root, startup_benchmark="--startup-benchmark" in sys.argv)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
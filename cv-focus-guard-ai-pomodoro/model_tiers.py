@@ -0,0 +1,164 @@
+import time
+from dataclasses import dataclass
+
+import cv2
+
+from profiler import PROFILER
+from vision import create_face_mesh
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    refine_landmarks: bool           # iris refinement model (landmarks 468-477)
+    input_scale: float = 1.0         # Face Mesh input resolution relative to the frame / ROI
+    min_detection_confidence: float = 0.5
+    min_tracking_confidence: float = 0.5
+
+
+# Best quality first. Lower tracking confidence keeps the cheap tracking
+# path instead of re-running face detection on marginal frames.
+TIERS = (
+    ModelTier("refined", True),
+    ModelTier("full", False),
+    ModelTier("reduced", False, input_scale=0.66),
+    ModelTier("fast", False, input_scale=0.5, min_tracking_confidence=0.3),
+)
+
+
+class FaceMeshManager:
+    """
+    Face Mesh with automatic quality tiers, driven by a latency budget.
+
+    Behaves like a FaceMesh (`process(image_rgb)`, `close()`), so it can
+    be passed to vision.detect_landmarks. It keeps a rolling average of
+    the inference time per tier; above `budget_ms` it steps down to a
+    cheaper tier, and after `upgrade_after` seconds comfortably below the
+    budget it tries the next better tier again (unless that tier is
+    already known to be too slow).
+
+    Refined (iris) tiers are used only while some consumer has asked for
+    them with `request_refined()`.
+    """
+
+    def __init__(self, budget_ms=25.0, tiers=TIERS, ema_alpha=0.1, min_samples=20,
+                 upgrade_margin=0.6, upgrade_after=30.0, min_side=192, clock=time.monotonic):
+        self.budget = budget_ms / 1000.0
+        self.tiers = tuple(tiers)
+        self.ema_alpha = ema_alpha
+        self.min_samples = min_samples
+        self.upgrade_margin = upgrade_margin
+        self.upgrade_after = upgrade_after
+        self.min_side = min_side
+        self.clock = clock
+
+        self.tier_latency = {}          # tier name -> EMA seconds, last time it ran
+        self.switches = 0
+        self._consumers = set()
+        self._face_mesh = None
+        self._built_for = None
+        self._index = None
+        self._select(self._allowed()[0])
+
+    # ----------------------------------------------------
+    # Consumers
+    # ----------------------------------------------------
+    def request_refined(self, consumer):
+        self._consumers.add(consumer)
+        if not self.tier.refine_landmarks:
+            self._select(self._allowed()[0])
+
+    def release_refined(self, consumer):
+        self._consumers.discard(consumer)
+        if not self._consumers and self.tier.refine_landmarks:
+            self._select(self._allowed()[0])
+
+    def _allowed(self):
+        refined = bool(self._consumers)
+        allowed = [i for i, t in enumerate(self.tiers) if t.refine_landmarks == refined]
+        return allowed or list(range(len(self.tiers)))
+
+    # ----------------------------------------------------
+    # Tier switching
+    # ----------------------------------------------------
+    @property
+    def tier(self):
+        return self.tiers[self._index]
+
+    def _select(self, index):
+        tier = self.tiers[index]
+        model_key = (tier.refine_landmarks, tier.min_detection_confidence, tier.min_tracking_confidence)
+        if model_key != self._built_for:
+            # resolution-only changes keep the current graph
+            if self._face_mesh is not None:
+                self._face_mesh.close()
+            self._face_mesh = create_face_mesh(*model_key)
+            self._built_for = model_key
+            # the first call on a new graph includes its set-up; do not count it
+            self._skip_next = True
+        if self._index is not None and index != self._index:
+            self.switches += 1
+            PROFILER.log_transition(
+                "facemesh_tier", tier.name,
+                f"Face Mesh tier: {self.tier.name} -> {tier.name}",
+            )
+        self._index = index
+        self._avg = None
+        self._samples = 0
+        self._since = self.clock()
+
+    def _record(self, seconds):
+        a = self.ema_alpha
+        self._avg = seconds if self._avg is None else (1 - a) * self._avg + a * seconds
+        self._samples += 1
+        if self._samples < self.min_samples:
+            return
+        self.tier_latency[self.tier.name] = self._avg
+
+        allowed = self._allowed()
+        pos = allowed.index(self._index) if self._index in allowed else 0
+        if self._avg > self.budget and pos + 1 < len(allowed):
+            self._select(allowed[pos + 1])
+        elif (pos > 0
+              and self._avg < self.budget * self.upgrade_margin
+              and self.clock() - self._since >= self.upgrade_after):
+            better = allowed[pos - 1]
+            known = self.tier_latency.get(self.tiers[better].name)
+            if known is None or known <= self.budget:
+                self._select(better)
+            else:
+                # known to be too slow: forget it slowly so it is retried later
+                self.tier_latency[self.tiers[better].name] = (known + self._avg) / 2
+                self._since = self.clock()
+
+    # ----------------------------------------------------
+    # FaceMesh interface
+    # ----------------------------------------------------
+    def process(self, image_rgb):
+        tier = self.tier
+        if tier.input_scale < 1.0:
+            h, w = image_rgb.shape[:2]
+            scale = max(tier.input_scale, self.min_side / max(1, min(h, w)))
+            if scale < 1.0:
+                image_rgb = cv2.resize(image_rgb, (int(w * scale), int(h * scale)),
+                                       interpolation=cv2.INTER_AREA)
+        t0 = time.perf_counter()
+        results = self._face_mesh.process(image_rgb)
+        if self._skip_next:
+            self._skip_next = False
+        else:
+            self._record(time.perf_counter() - t0)
+        return results
+
+    def close(self):
+        if self._face_mesh is not None:
+            self._face_mesh.close()
+            self._face_mesh = None
+
+    def stats(self):
+        return {
+            "tier": self.tier.name,
+            "avg_ms": (self._avg or 0.0) * 1000.0,
+            "budget_ms": self.budget * 1000.0,
+            "switches": self.switches,
+        }
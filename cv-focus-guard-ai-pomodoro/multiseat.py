@@ -0,0 +1,249 @@
+"""
+Headless multi-seat mode: focus tracking for several desks from one box.
+
+    python multiseat.py 0 1 2                  # three cameras
+    python multiseat.py desk1.mp4 desk2.mp4    # video files stand in for cameras
+    python multiseat.py 0 1 --seconds 3600 --json
+
+Each seat (camera index or video file) runs in its own worker process
+with its own Face Mesh, through the same detection and flow-tracking code
+as replay.py. Workers send live status and closed flow segments to a
+central SeatAggregator in the parent process.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from queue import Empty
+from typing import Dict, List, Optional
+
+from analytics import flow_break_reason
+from focus_detector import load_thresholds
+from settings import THRESHOLDS_FILE
+
+
+@dataclass
+class SeatStatus:
+    seat: str
+    source: str
+    timestamp: float = 0.0
+    frames: int = 0
+    fps: float = 0.0
+    face_detected: bool = False
+    unfocused_reason: Optional[str] = None
+    in_flow: bool = False
+    done: bool = False
+    segments: List[dict] = field(default_factory=list)
+
+
+def _camera_frames(index, stop_event, seconds=None):
+    from camera import open_camera
+
+    cap, _ = open_camera(index)
+    t0 = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            ts = time.monotonic() - t0
+            if seconds is not None and ts >= seconds:
+                break
+            ret, frame = cap.read()
+            if ret:
+                yield ts, frame
+    finally:
+        cap.release()
+
+
+def _until_stopped(frames, stop_event):
+    for item in frames:
+        if stop_event.is_set():
+            break
+        yield item
+
+
+def run_seat(seat, source, messages, stop_event, fps=None, seconds=None,
+             max_frames=None, roi=True, status_interval=1.0, thresholds=None):
+    """
+    Worker process body: one seat, one Face Mesh. Returns the replay report.
+    """
+    import cv2
+    from replay import iter_frames, replay
+    from roi_tracker import RoiTracker
+    from vision import create_face_mesh
+
+    # one seat per core: keep OpenCV from starting its own thread pool
+    cv2.setNumThreads(1)
+
+    if source.isdigit():
+        frames = _camera_frames(int(source), stop_event, seconds)
+    else:
+        frames = _until_stopped(iter_frames(source, fps), stop_event)
+
+    state = {"frames": 0, "flow_start": None, "last_status": 0.0, "t0": time.perf_counter()}
+
+    def on_frame(ts, face_detected, reason, in_flow):
+        state["frames"] += 1
+        if in_flow and state["flow_start"] is None:
+            state["flow_start"] = ts
+        elif not in_flow and state["flow_start"] is not None:
+            messages.put(("segment", seat, {
+                "start": state["flow_start"], "end": ts, "break_reason": flow_break_reason(False, False),
+            }))
+            state["flow_start"] = None
+
+        now = time.perf_counter()
+        if now - state["last_status"] >= status_interval:
+            state["last_status"] = now
+            messages.put(("status", seat, {
+                "timestamp": ts,
+                "frames": state["frames"],
+                "fps": state["frames"] / max(now - state["t0"], 1e-9),
+                "face_detected": face_detected,
+                "unfocused_reason": reason,
+                "in_flow": in_flow,
+            }))
+
+    face_mesh = create_face_mesh()
+    try:
+        report = replay(frames, face_mesh, max_frames=max_frames,
+                        roi_tracker=RoiTracker() if roi else None, on_frame=on_frame,
+                        thresholds=thresholds)
+    finally:
+        face_mesh.close()
+    messages.put(("done", seat, {
+        "timestamp": report["video_seconds"], "frames": report["frames"], "fps": report["fps"],
+    }))
+    return report
+
+
+class SeatAggregator:
+    """
+    Collects live status and flow segments from all seat workers.
+    """
+
+    def __init__(self, sources):
+        self.seats: Dict[str, SeatStatus] = {
+            f"seat{i}": SeatStatus(seat=f"seat{i}", source=source)
+            for i, source in enumerate(sources)
+        }
+
+    def handle(self, message):
+        kind, seat, payload = message
+        status = self.seats[seat]
+        if kind == "segment":
+            status.segments.append(payload)
+        else:
+            for key, value in payload.items():
+                setattr(status, key, value)
+            status.done = kind == "done"
+
+    def drain(self, messages, timeout=0.0):
+        """
+        Handle every queued message; wait up to `timeout` for the first one.
+        """
+        try:
+            self.handle(messages.get(timeout=timeout))
+            while True:
+                self.handle(messages.get_nowait())
+        except Empty:
+            pass
+
+    def status_lines(self):
+        lines = []
+        for s in self.seats.values():
+            if s.done:
+                state = "done"
+            elif not s.face_detected:
+                state = "no face"
+            elif s.unfocused_reason:
+                state = s.unfocused_reason
+            else:
+                state = "in flow" if s.in_flow else "focused"
+            lines.append(
+                f"{s.seat:<7}{s.source[-24:]:<26}{s.timestamp:>9.1f}s{s.frames:>8} frames"
+                f"{s.fps:>7.1f} FPS  {len(s.segments):>3} segments  {state}"
+            )
+        return lines
+
+    def report(self):
+        return {seat: asdict(status) for seat, status in self.seats.items()}
+
+
+def run(sources, workers=None, status_interval=1.0, quiet=False, **seat_options):
+    """
+    Run every seat in a process pool and aggregate until all have finished.
+
+    Returns (aggregator, reports, wall_seconds) with reports keyed by seat.
+    """
+    ctx = mp.get_context("spawn")
+    manager = ctx.Manager()
+    messages = manager.Queue()
+    stop_event = manager.Event()
+    aggregator = SeatAggregator(sources)
+
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or len(sources), mp_context=ctx) as pool:
+        futures = {
+            seat: pool.submit(run_seat, seat, status.source, messages, stop_event,
+                              status_interval=status_interval, **seat_options)
+            for seat, status in aggregator.seats.items()
+        }
+        last_print = 0.0
+        try:
+            while not all(f.done() for f in futures.values()):
+                aggregator.drain(messages, timeout=0.2)
+                if not quiet and time.perf_counter() - last_print >= status_interval:
+                    last_print = time.perf_counter()
+                    print("\n".join(aggregator.status_lines()), end="\n\n", flush=True)
+        except KeyboardInterrupt:
+            stop_event.set()
+
+        reports = {}
+        for seat, future in futures.items():
+            try:
+                reports[seat] = future.result()
+            except Exception as e:
+                print(f"{seat} failed: {e}", file=sys.stderr)
+    aggregator.drain(messages)
+    wall = time.perf_counter() - wall_start
+    manager.shutdown()
+    return aggregator, reports, wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless focus tracking for several seats.")
+    parser.add_argument("sources", nargs="+", help="camera indexes and/or video files, one per seat")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per seat)")
+    parser.add_argument("--fps", type=float, default=None, help="timestamp rate override for video files")
+    parser.add_argument("--seconds", type=float, default=None, help="stop cameras after this long")
+    parser.add_argument("--max-frames", type=int, default=None, help="frames per seat")
+    parser.add_argument("--no-roi", action="store_true", help="run Face Mesh on full frames")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE,
+                        help="per-user thresholds from calibration.py, used for every seat")
+    parser.add_argument("--json", action="store_true", help="print the aggregated result as JSON")
+    args = parser.parse_args(argv)
+
+    aggregator, reports, wall = run(
+        args.sources, workers=args.workers, quiet=args.json,
+        fps=args.fps, seconds=args.seconds, max_frames=args.max_frames, roi=not args.no_roi,
+        thresholds=load_thresholds(args.thresholds),
+    )
+    total_frames = sum(r["frames"] for r in reports.values())
+
+    if args.json:
+        print(json.dumps({
+            "seats": aggregator.report(),
+            "wall_seconds": wall,
+            "total_fps": total_frames / wall if wall > 0 else 0.0,
+        }, indent=2))
+    else:
+        print("\n".join(aggregator.status_lines()))
+        print(f"Total: {total_frames} frames in {wall:.1f}s = {total_frames / wall:.1f} FPS "
+              f"across {len(reports)} seat(s)")
+    return 0 if len(reports) == len(args.sources) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
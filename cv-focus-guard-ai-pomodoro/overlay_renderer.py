@@ -0,0 +1,87 @@
+import time
+
+import cv2
+import numpy as np
+
+from focus_detector import FOCUS_INDICES
+from profiler import PROFILER
+
+DETAIL_LEVELS = ("off", "focus_points", "contours", "mesh")
+
+
+def _edge_array(level):
+    """
+    (E, 2) landmark index pairs for a detail level. Only the contour and
+    mesh levels need mediapipe's connection tables, imported on first use.
+    """
+    if level == "focus_points":
+        points = np.unique(FOCUS_INDICES)
+        # zero-length segments draw as dots
+        return np.stack([points, points], axis=1)
+    import mediapipe as mp
+    face_mesh = mp.solutions.face_mesh
+    connections = face_mesh.FACEMESH_CONTOURS if level == "contours" else face_mesh.FACEMESH_TESSELATION
+    return np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+
+
+class OverlayRenderer:
+    """
+    Draws face landmarks with one NumPy gather and one cv2.polylines call.
+
+    Detail levels: "off", "focus_points" (the eye / nose / face points
+    FocusDetector reads), "contours" or "mesh" (full tesselation). The
+    connection index arrays are built once per level, when first drawn. If
+    the average draw time goes over `budget_ms`, the detail level steps
+    down until it fits.
+    """
+
+    def __init__(self, detail="mesh", color=(0, 255, 0), thickness=1,
+                 budget_ms=3.0, ema_alpha=0.1, min_samples=20):
+        if detail not in DETAIL_LEVELS:
+            raise ValueError(f"Unknown overlay detail level: {detail}")
+        self.detail = detail
+        self.color = color
+        self.thickness = thickness
+        self.budget = budget_ms / 1000.0
+        self.ema_alpha = ema_alpha
+        self.min_samples = min_samples
+        self.avg_draw_time = None
+        self._samples = 0
+        self._edges = {}
+
+    def draw(self, image, landmarks):
+        """
+        Draw (N, 3) normalized landmarks onto `image` in place.
+        """
+        if self.detail == "off" or landmarks is None:
+            return
+        t0 = time.perf_counter()
+
+        h, w = image.shape[:2]
+        pts = (landmarks[:, :2] * (w, h)).astype(np.int32)
+        edges = self._edges.get(self.detail)
+        if edges is None:
+            edges = self._edges[self.detail] = _edge_array(self.detail)
+        segments = pts[edges]
+        thickness = self.thickness * 3 if self.detail == "focus_points" else self.thickness
+        cv2.polylines(image, segments, False, self.color, thickness)
+
+        elapsed = time.perf_counter() - t0
+        PROFILER.record("overlay", elapsed)
+        self._track_cost(elapsed)
+
+    def _track_cost(self, seconds):
+        a = self.ema_alpha
+        self.avg_draw_time = (
+            seconds if self.avg_draw_time is None
+            else (1 - a) * self.avg_draw_time + a * seconds
+        )
+        self._samples += 1
+        if self._samples >= self.min_samples and self.avg_draw_time > self.budget:
+            self.detail = DETAIL_LEVELS[DETAIL_LEVELS.index(self.detail) - 1]
+            self.avg_draw_time = None
+            self._samples = 0
+            PROFILER.log_transition(
+                "overlay_detail", self.detail,
+                f"Overlay over budget, detail lowered to '{self.detail}'",
+            )
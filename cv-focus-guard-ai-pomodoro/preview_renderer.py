@@ -0,0 +1,64 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class PreviewRenderer:
+    """
+    Webcam preview with no per-frame allocations.
+
+    `prepare()` runs on the inference worker: it resizes the frame once to
+    display size and converts it to RGB, both into preallocated buffers
+    (a small rotation, so the Tk thread never reads a buffer that is being
+    written). `render()` runs on the Tk thread and copies the pixels into
+    one persistent PIL image / PhotoImage, which Tk updates in place.
+    Rendering is capped at `max_fps`, independent of the inference rate.
+    """
+
+    def __init__(self, size=(360, 270), max_fps=30.0, buffers=3, clock=time.monotonic):
+        self.size = size
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.clock = clock
+
+        w, h = size
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._rgb = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(buffers)]
+        self._next = 0
+
+        self._image = None
+        self._photo = None
+        self._last_render = float("-inf")
+
+        self.frames_prepared = 0
+        self.frames_rendered = 0
+
+    def prepare(self, frame):
+        """
+        Resize + BGR->RGB into the next preallocated buffer and return it.
+        """
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+        rgb = self._rgb[self._next]
+        self._next = (self._next + 1) % len(self._rgb)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=rgb)
+        self.frames_prepared += 1
+        return rgb
+
+    def due(self, now=None):
+        now = self.clock() if now is None else now
+        return now - self._last_render >= self.min_interval
+
+    def render(self, label, rgb, now=None):
+        """
+        Show a prepared buffer on a Tk / CustomTkinter label.
+        """
+        if self._photo is None:
+            # Tk / PIL only on the display side, so headless users can prepare()
+            from PIL import Image, ImageTk
+            self._image = Image.new("RGB", self.size)
+            self._photo = ImageTk.PhotoImage(self._image)
+            label.configure(image=self._photo)
+        self._image.frombytes(rgb)
+        self._photo.paste(self._image)
+        self._last_render = self.clock() if now is None else now
+        self.frames_rendered += 1
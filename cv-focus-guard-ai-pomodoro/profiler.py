@@ -0,0 +1,148 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+STAGES = ("capture", "color", "facemesh", "detection", "flow", "overlay", "render", "verdict_latency")
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class StageProfiler:
+    """
+    Per-stage hot-path timings kept in preallocated arrays.
+
+    For every stage it keeps a rolling window of the last `window` samples
+    (for percentiles on the dashboard) and cumulative bucket counts, sum
+    and count (for the Prometheus text export). Recording a sample does
+    not allocate.
+    """
+
+    def __init__(self, stages=STAGES, window=512, buckets=BUCKETS):
+        self.stages = tuple(stages)
+        self._index = {name: i for i, name in enumerate(self.stages)}
+        self.window = window
+        self.buckets = tuple(buckets)
+
+        n = len(self.stages)
+        self._samples = np.zeros((n, window), dtype=np.float64)
+        self._pos = np.zeros(n, dtype=np.int64)
+        self._filled = np.zeros(n, dtype=np.int64)
+        self._bucket_counts = np.zeros((n, len(self.buckets) + 1), dtype=np.int64)
+        self._sum = np.zeros(n, dtype=np.float64)
+        self._count = np.zeros(n, dtype=np.int64)
+
+        self._last_values = {}
+
+    def record(self, stage, seconds):
+        i = self._index[stage]
+        pos = self._pos[i]
+        self._samples[i, pos] = seconds
+        self._pos[i] = (pos + 1) % self.window
+        if self._filled[i] < self.window:
+            self._filled[i] += 1
+        self._bucket_counts[i, bisect_left(self.buckets, seconds)] += 1
+        self._sum[i] += seconds
+        self._count[i] += 1
+
+    def percentiles(self, stage, q=(50, 95)):
+        """
+        Rolling percentiles of a stage in milliseconds (zeros if no samples).
+        """
+        i = self._index[stage]
+        filled = self._filled[i]
+        if not filled:
+            return tuple(0.0 for _ in q)
+        return tuple(np.percentile(self._samples[i, :filled], q) * 1000.0)
+
+    def summary_text(self):
+        lines = []
+        for stage in self.stages:
+            p50, p95 = self.percentiles(stage)
+            lines.append(f"{stage:<10} p50 {p50:6.2f}  p95 {p95:6.2f} ms")
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix="focusguard"):
+        name = f"{prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} Per-stage frame loop latency.",
+            f"# TYPE {name} histogram",
+        ]
+        for i, stage in enumerate(self.stages):
+            cumulative = np.cumsum(self._bucket_counts[i])
+            for bound, count in zip(self.buckets, cumulative):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {self._sum[i]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {self._count[i]}')
+        return "\n".join(lines) + "\n"
+
+    def log_transition(self, key, value, message):
+        """
+        Print `message` only when `value` differs from the last one seen for `key`.
+        """
+        if self._last_values.get(key, object()) != value:
+            self._last_values[key] = value
+            print(message)
+
+
+# Shared instance used by the pipeline, vision helpers and the UI
+PROFILER = StageProfiler()
+
+
+class MetricsExporter:
+    """
+    Exposes a profiler in Prometheus text format: over HTTP on localhost
+    (GET /metrics) if `port` is set, and/or by rewriting `dump_path`
+    every `dump_interval` seconds.
+    """
+
+    def __init__(self, profiler, port=None, dump_path=None, dump_interval=10.0):
+        self.profiler = profiler
+        self.port = port
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._server = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.port:
+            profiler = self.profiler
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = profiler.prometheus_text().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        if self.dump_path:
+            threading.Thread(target=self._dump_loop, daemon=True).start()
+
+    def _dump_loop(self):
+        while not self._stop.wait(self.dump_interval):
+            try:
+                with open(self.dump_path, "w") as f:
+                    f.write(self.profiler.prometheus_text())
+            except OSError as e:
+                print(f"Unable to write metrics: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
@@ -0,0 +1,182 @@
+"""
+Headless replay: run the focus pipeline over recorded footage at full speed.
+
+    python replay.py session.mp4
+    python replay.py frames_dir/ --fps 15 --json
+
+Frames go through the same Face Mesh, FocusDetector (with the per-user
+thresholds.json, like the live app) and flow-transition logic as the
+live app, with no Tk window, sleeps or throttling. Timestamps
+are taken from the video position, so flow segments are in video time.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import cv2
+
+from analytics import SessionAnalytics, FlowTracker
+from focus_detector import FocusDetector, load_thresholds
+from roi_tracker import RoiTracker
+from settings import THRESHOLDS_FILE
+from vision import create_face_mesh, detect_landmarks
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def iter_frames(source, fps=None):
+    """
+    Yield (timestamp_seconds, bgr_frame) from a video file or an image directory.
+    """
+    if os.path.isdir(source):
+        fps = fps or 30.0
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for i, name in enumerate(names):
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                yield i / fps, frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {source}")
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+    i = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield i / fps, frame
+            i += 1
+    finally:
+        cap.release()
+
+
+def replay(frames, face_mesh=None, max_frames=None, roi_tracker=None, on_frame=None,
+           thresholds=None):
+    """
+    Run frames through detection and flow tracking as one Work session.
+    `thresholds` are FocusDetector keyword arguments (see load_thresholds);
+    None means the defaults.
+
+    `on_frame(ts, face_detected, reason, in_flow)` is called after each
+    frame, if given. Returns a report dict with flow segments, reason
+    counts and throughput.
+    """
+    face_mesh = face_mesh or create_face_mesh()
+    thresholds = thresholds or {}
+    analytics = SessionAnalytics(start_time=0.0)
+    flow_tracker = FlowTracker()
+    reason_counts = Counter()
+
+    n_frames = 0
+    n_faces = 0
+    inference_time = 0.0
+    last_ts = 0.0
+
+    wall_start = time.perf_counter()
+    for ts, frame in frames:
+        if max_frames is not None and n_frames >= max_frames:
+            break
+
+        t0 = time.perf_counter()
+        _, _, landmarks = detect_landmarks(face_mesh, frame, roi_tracker)
+        face_detected = landmarks is not None
+        reason = None
+        if face_detected:
+            n_faces += 1
+            reason = FocusDetector(landmarks, **thresholds).is_unfocused()
+            if reason:
+                reason_counts[reason] += 1
+        inference_time += time.perf_counter() - t0
+
+        in_flow = flow_tracker.update(analytics, ts, is_focus_active=True, face_detected=face_detected)
+        if on_frame is not None:
+            on_frame(ts, face_detected, reason, in_flow)
+        n_frames += 1
+        last_ts = ts
+    wall_time = time.perf_counter() - wall_start
+
+    analytics.finish_session(now=last_ts)
+
+    report = {
+        "frames": n_frames,
+        "frames_with_face": n_faces,
+        "video_seconds": last_ts,
+        "wall_seconds": wall_time,
+        "fps": n_frames / wall_time if wall_time > 0 else 0.0,
+        "inference_fps": n_frames / inference_time if inference_time > 0 else 0.0,
+        "unfocused_frames": dict(reason_counts),
+        "segments": [
+            {"start": start, "end": end, "break_reason": reason}
+            for start, end, reason in analytics.segments()
+        ],
+    }
+    if roi_tracker is not None:
+        report["roi"] = roi_tracker.stats()
+    return report
+
+
+def format_report(report):
+    lines = ["Flow segments:"]
+    if not report["segments"]:
+        lines.append("  (none)")
+    for seg in report["segments"]:
+        end = seg["end"] if seg["end"] is not None else report["video_seconds"]
+        reason = seg["break_reason"] or "open at end of video"
+        lines.append(f"  {seg['start']:8.2f}s -> {end:8.2f}s  ({end - seg['start']:.2f}s)  {reason}")
+
+    lines.append("Unfocused frames:")
+    if not report["unfocused_frames"]:
+        lines.append("  (none)")
+    for reason, count in sorted(report["unfocused_frames"].items(), key=lambda kv: -kv[1]):
+        lines.append(f"  {reason}: {count}")
+
+    lines.append(
+        f"Throughput: {report['frames']} frames in {report['wall_seconds']:.2f}s "
+        f"= {report['fps']:.1f} FPS (inference only: {report['inference_fps']:.1f} FPS), "
+        f"face found in {report['frames_with_face']} frames"
+    )
+    if "roi" in report:
+        roi = report["roi"]
+        lines.append(
+            f"ROI: hit rate {roi['hit_rate'] * 100:.1f}%, "
+            f"{roi['avg_roi_ms']:.1f} ms ROI vs {roi['avg_full_ms']:.1f} ms full frame, "
+            f"{roi['saved_ms']:.0f} ms saved, tracking lost {roi['lost_count']} times"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded footage through the focus pipeline.")
+    parser.add_argument("source", help="video file or directory of images")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="timestamp rate for image directories (or to override the video's FPS)")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--roi", action="store_true", help="crop Face Mesh input to the tracked face region")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE,
+                        help="per-user thresholds from calibration.py (defaults if missing)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        report = replay(
+            iter_frames(args.source, args.fps),
+            max_frames=args.max_frames,
+            roi_tracker=RoiTracker() if args.roi else None,
+            thresholds=load_thresholds(args.thresholds),
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
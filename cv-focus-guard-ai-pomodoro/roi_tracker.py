@@ -0,0 +1,119 @@
+import cv2
+import numpy as np
+
+
+class RoiTracker:
+    """
+    Crops Face Mesh input to the area around the last detected face.
+
+    The region is the previous frame's landmark bounding box, squared up
+    and grown by `margin` on each side, then downscaled so its longest
+    side is at most `max_side` pixels. When no face is found in the
+    region the tracker is reset and the next frame uses the full image.
+    """
+
+    def __init__(self, margin=0.3, max_side=320, min_side=64, ema_alpha=0.05):
+        self.margin = margin
+        self.max_side = max_side
+        self.min_side = min_side
+        self.ema_alpha = ema_alpha
+
+        self.box = None          # (x0, y0, x1, y1) in pixels, or None when lost
+
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost_count = 0
+        self.avg_roi_time = None
+        self.avg_full_time = None
+        self.saved_seconds = 0.0
+
+    def crop(self, frame):
+        """
+        Return (image, box) to feed to Face Mesh. box is None for the full frame.
+        """
+        if self.box is None:
+            return frame, None
+        x0, y0, x1, y1 = self.box
+        roi = frame[y0:y1, x0:x1]
+        longest = max(x1 - x0, y1 - y0)
+        if longest > self.max_side:
+            scale = self.max_side / longest
+            roi = cv2.resize(
+                roi, (max(1, int((x1 - x0) * scale)), max(1, int((y1 - y0) * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        return roi, self.box
+
+    @staticmethod
+    def to_full_frame(points, box, frame_shape):
+        """
+        Map (N, 3) landmarks normalized to `box` back to full-frame normalization.
+        """
+        if box is None:
+            return points
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        bw, bh = x1 - x0, y1 - y0
+        out = np.empty_like(points)
+        out[:, 0] = (points[:, 0] * bw + x0) / w
+        out[:, 1] = (points[:, 1] * bh + y0) / h
+        # mediapipe z is on roughly the same scale as x
+        out[:, 2] = points[:, 2] * (bw / w)
+        return out
+
+    def update(self, points, frame_shape):
+        """
+        Set the next region from full-frame normalized landmarks, or reset if None.
+        """
+        if points is None:
+            if self.box is not None:
+                self.lost_count += 1
+            self.box = None
+            return
+
+        h, w = frame_shape[:2]
+        xs = points[:, 0] * w
+        ys = points[:, 1] * h
+        cx = (xs.min() + xs.max()) / 2.0
+        cy = (ys.min() + ys.max()) / 2.0
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1.0 + 2.0 * self.margin)
+        side = max(side, self.min_side)
+
+        x0 = int(max(0, cx - side / 2))
+        y0 = int(max(0, cy - side / 2))
+        x1 = int(min(w, cx + side / 2))
+        y1 = int(min(h, cy + side / 2))
+        if x1 - x0 < self.min_side or y1 - y0 < self.min_side:
+            self.box = None
+            return
+        # a region covering (almost) the whole frame saves nothing
+        if (x1 - x0) * (y1 - y0) > 0.8 * w * h:
+            self.box = None
+            return
+        self.box = (x0, y0, x1, y1)
+
+    def record(self, used_roi, seconds):
+        """
+        Record how long one Face Mesh call took, for hit rate and savings.
+        """
+        a = self.ema_alpha
+        if used_roi:
+            self.roi_frames += 1
+            self.avg_roi_time = seconds if self.avg_roi_time is None else (1 - a) * self.avg_roi_time + a * seconds
+            if self.avg_full_time is not None:
+                self.saved_seconds += max(0.0, self.avg_full_time - seconds)
+        else:
+            self.full_frames += 1
+            self.avg_full_time = seconds if self.avg_full_time is None else (1 - a) * self.avg_full_time + a * seconds
+
+    def stats(self):
+        total = self.roi_frames + self.full_frames
+        return {
+            "hit_rate": self.roi_frames / total if total else 0.0,
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "lost_count": self.lost_count,
+            "avg_roi_ms": (self.avg_roi_time or 0.0) * 1000,
+            "avg_full_ms": (self.avg_full_time or 0.0) * 1000,
+            "saved_ms": self.saved_seconds * 1000,
+        }
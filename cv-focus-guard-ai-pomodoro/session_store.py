@@ -0,0 +1,239 @@
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          TEXT PRIMARY KEY,
+    start_time  REAL NOT NULL,
+    end_time    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time);
+
+CREATE TABLE IF NOT EXISTS flow_segments (
+    id           INTEGER PRIMARY KEY,
+    session_id   TEXT NOT NULL REFERENCES sessions(id),
+    start        REAL NOT NULL,
+    end          REAL,
+    break_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_segments_start ON flow_segments(start);
+CREATE INDEX IF NOT EXISTS idx_segments_reason ON flow_segments(break_reason);
+CREATE INDEX IF NOT EXISTS idx_segments_session ON flow_segments(session_id);
+
+-- Precomputed per-day totals, kept up to date on every insert
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day            TEXT PRIMARY KEY,   -- local date, YYYY-MM-DD
+    work_seconds   REAL NOT NULL DEFAULT 0,
+    flow_seconds   REAL NOT NULL DEFAULT 0,
+    segments       INTEGER NOT NULL DEFAULT 0,
+    longest_streak REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS daily_reason_counts (
+    day    TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    count  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, reason)
+);
+"""
+
+_STOP = object()
+
+
+def day_of(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+def connect(path, check_same_thread=True):
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SessionStore:
+    """
+    SQLite-backed history of Work sessions and their flow segments.
+
+    `save_session` only snapshots the session and queues it; a background
+    writer thread inserts queued sessions in batches, one transaction per
+    batch, and updates the daily rollups in the same transaction. Queries
+    use their own connection, which WAL mode lets run alongside the writer.
+    """
+
+    def __init__(self, path, flush_interval=2.0, max_batch=64):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    # ----------------------------------------------------
+    # Writes (any thread, never blocks on disk)
+    # ----------------------------------------------------
+    def save_session(self, analytics, now: Optional[float] = None):
+        """
+        Queue a finished (or abandoned) session for writing.
+        Open segments are closed at the session end with no break reason.
+        """
+        end_time = analytics.end_time or (time.time() if now is None else now)
+        segments = [
+            (start, end if end is not None else end_time, reason)
+            for start, end, reason in analytics.segments()
+        ]
+        self._queue.put((uuid.uuid4().hex, analytics.start_time, end_time, segments))
+
+    def close(self, timeout=5.0):
+        """
+        Flush everything still queued, stop the writer and close the
+        read connections of every thread that queried.
+        """
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch:
+                try:
+                    with conn:
+                        for session in batch:
+                            self._insert_session(conn, *session)
+                except sqlite3.Error as e:
+                    print(f"Unable to save session history: {e}")
+        conn.close()
+
+    @staticmethod
+    def _insert_session(conn, session_id, start_time, end_time, segments):
+        conn.execute(
+            "INSERT INTO sessions (id, start_time, end_time) VALUES (?, ?, ?)",
+            (session_id, start_time, end_time),
+        )
+        conn.executemany(
+            "INSERT INTO flow_segments (session_id, start, end, break_reason) VALUES (?, ?, ?, ?)",
+            [(session_id, start, end, reason) for start, end, reason in segments],
+        )
+
+        # Daily rollups: session time goes to the day it started,
+        # flow time to the day each segment started.
+        days = {}
+        reasons = {}
+        work_day = day_of(start_time)
+        days.setdefault(work_day, [0.0, 0.0, 0, 0.0])[0] += max(0.0, end_time - start_time)
+        for start, end, reason in segments:
+            duration = max(0.0, end - start)
+            row = days.setdefault(day_of(start), [0.0, 0.0, 0, 0.0])
+            row[1] += duration
+            row[2] += 1
+            row[3] = max(row[3], duration)
+            if reason:
+                key = (day_of(start), reason)
+                reasons[key] = reasons.get(key, 0) + 1
+
+        conn.executemany(
+            """
+            INSERT INTO daily_rollups (day, work_seconds, flow_seconds, segments, longest_streak)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                work_seconds = work_seconds + excluded.work_seconds,
+                flow_seconds = flow_seconds + excluded.flow_seconds,
+                segments = segments + excluded.segments,
+                longest_streak = MAX(longest_streak, excluded.longest_streak)
+            """,
+            [(day, *row) for day, row in days.items()],
+        )
+        conn.executemany(
+            """
+            INSERT INTO daily_reason_counts (day, reason, count) VALUES (?, ?, ?)
+            ON CONFLICT(day, reason) DO UPDATE SET count = count + excluded.count
+            """,
+            [(day, reason, count) for (day, reason), count in reasons.items()],
+        )
+
+    # ----------------------------------------------------
+    # Queries (use a per-thread read connection)
+    # ----------------------------------------------------
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # only used by this thread, but closed by close() on another
+            conn = connect(self.path, check_same_thread=False)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def daily_focus(self, days=90, now=None) -> List[Tuple[str, float, float, float]]:
+        """
+        (day, work_seconds, flow_seconds, focus_ratio_pct) for the last `days` days.
+        """
+        now = time.time() if now is None else now
+        since = day_of(now - days * 86400)
+        rows = self._reader().execute(
+            "SELECT day, work_seconds, flow_seconds FROM daily_rollups WHERE day > ? ORDER BY day",
+            (since,),
+        ).fetchall()
+        return [
+            (day, work, flow, (flow / work * 100) if work > 0 else 0.0)
+            for day, work, flow in rows
+        ]
+
+    def reason_counts(self, days=90, now=None) -> List[Tuple[str, int]]:
+        """
+        Flow break reasons over the last `days` days, most common first.
+        """
+        now = time.time() if now is None else now
+        since = day_of(now - days * 86400)
+        return self._reader().execute(
+            """
+            SELECT reason, SUM(count) AS n FROM daily_reason_counts
+            WHERE day > ? GROUP BY reason ORDER BY n DESC
+            """,
+            (since,),
+        ).fetchall()
+
+    def segments_between(self, start, end, reason=None):
+        """
+        Raw flow segments that started in [start, end), optionally for one break reason.
+        """
+        sql = "SELECT session_id, start, end, break_reason FROM flow_segments WHERE start >= ? AND start < ?"
+        params = [start, end]
+        if reason is not None:
+            sql += " AND break_reason = ?"
+            params.append(reason)
+        return self._reader().execute(sql + " ORDER BY start", params).fetchall()
@@ -0,0 +1,78 @@
+import math
+import time
+
+
+class CountdownTimer:
+    """
+    Pomodoro countdown driven by a monotonic deadline.
+
+    Remaining time is always computed as `deadline - clock()`, never by
+    counting ticks, so late or missed ticks cannot make it drift. Pausing
+    stores the remaining time and clears the deadline; resuming sets a
+    new deadline from it. The timer itself never sleeps or spins: the
+    caller asks `next_tick_delay()` when to look again.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.duration = 0.0
+        self.deadline = None
+        self.paused_remaining = None
+
+    def start(self, seconds):
+        self.duration = float(seconds)
+        self.paused_remaining = None
+        self.deadline = self.clock() + self.duration
+
+    def stop(self):
+        self.deadline = None
+        self.paused_remaining = None
+
+    @property
+    def is_running(self):
+        return self.deadline is not None or self.paused_remaining is not None
+
+    @property
+    def is_paused(self):
+        return self.paused_remaining is not None
+
+    def pause(self):
+        if self.deadline is not None:
+            self.paused_remaining = max(0.0, self.deadline - self.clock())
+            self.deadline = None
+
+    def resume(self):
+        if self.paused_remaining is not None:
+            self.deadline = self.clock() + self.paused_remaining
+            self.paused_remaining = None
+
+    def remaining(self):
+        if self.paused_remaining is not None:
+            return self.paused_remaining
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - self.clock())
+
+    def remaining_seconds(self):
+        """
+        Whole seconds to display (rounded up, so 25:00 shows until a full second has passed).
+        """
+        return math.ceil(self.remaining())
+
+    def expired(self):
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def next_tick_delay(self):
+        """
+        Seconds until the displayed whole second changes.
+        """
+        remaining = self.remaining()
+        fraction = remaining - math.floor(remaining)
+        return fraction if fraction > 0 else 1.0
+
+    def next_tick_delay_ms(self):
+        """
+        next_tick_delay() as a Tk `after` delay, +1 ms so the tick lands
+        just after the second boundary.
+        """
+        return math.ceil(self.next_tick_delay() * 1000) + 1
@@ -0,0 +1,65 @@
+"""
+Tracking settings, shared by the in-process app (main.py) and the
+tracking engine process (engine.py), so both modes behave the same.
+Relative paths are resolved against the working directory; main.py
+starts the engine in its own.
+"""
+
+# Per-user thresholds from `python calibration.py fit ...` (defaults if missing)
+THRESHOLDS_FILE = "thresholds.json"
+# Raw per-verdict metrics (ratios, EAR, face, input rates) for offline analysis
+RECORD_TIMELINE = True
+TIMELINE_DIR = "timeline"
+
+# No keyboard / mouse input for this long during Work ends the flow segment
+INACTIVITY_THRESHOLD_SECONDS = 120
+TRACK_MOUSE_MOVES = True
+
+# Active-window rules (case-insensitive regexes searched in the title). On-task wins,
+# so keep them tight: app names are matched as whole words or as the title suffix
+# ("Report.docx - Word"), never inside "WordPress" or "Terminal velocity - YouTube".
+ON_TASK_WINDOWS = [
+    r"\bFocus Guard\b", r"\bVisual Studio Code$", r"\bPyCharm\b", r"(^|[-–—] )Terminal$",
+    r"\bMicrosoft Word\b", r"[-–—] Word$", r"\bMicrosoft Excel\b", r"[-–—] Excel$",
+]
+DISTRACTING_WINDOWS = [
+    r"\bYouTube\b", r"\bNetflix\b", r"\bFacebook\b", r"\bInstagram\b", r"\bTwitter\b",
+    r"\bReddit\b", r"\bTikTok\b",
+]
+WINDOW_POLL_SECONDS = 0.5
+
+# Camera capture: small MJPG frames and a 1-frame driver buffer keep latency low.
+# Run `python camera.py` to compare settings on this machine.
+CAMERA_INDEX = 0
+CAPTURE_SETTINGS = {"width": 640, "height": 480, "fps": 30, "fourcc": "MJPG", "buffer_size": 1}
+
+# Face Mesh quality tiers step down when inference exceeds this budget
+FACE_MESH_BUDGET_MS = 25.0
+# Iris-based gaze signal; the only consumer of refined (iris) landmarks
+USE_IRIS_GAZE = False
+
+# Face Mesh runs per second in each state (0 = no inference)
+INFERENCE_RATES = {
+    "idle": 0.0,
+    "paused": 0.0,
+    "break": 0.0,
+    "focused": 2.0,
+    "alert": 15.0,
+}
+INFERENCE_BOOST_SECONDS = 5.0
+# Crop Face Mesh input to the region around the last detected face
+USE_FACE_ROI = True
+# Reuse the last verdict while the camera image is unchanged
+USE_FRAME_GATE = True
+FRAME_GATE_THRESHOLD = 3.0      # mean gray-level difference on a 64x48 thumbnail
+FRAME_GATE_MAX_AGE = 1.0        # seconds before a refresh is forced
+
+# Webcam preview size (independent of the inference rate)
+DISPLAY_SIZE = (360, 270)
+# Landmark overlay: "off", "focus_points", "contours" or "mesh"
+OVERLAY_DETAIL = "mesh"
+OVERLAY_BUDGET_MS = 3.0      # ~10% of a 30 FPS frame
+
+# Seconds of continuous unfocus before the visual warning / sound alert
+FOCUS_WARNING_SECONDS = 0.5
+FOCUS_ALERT_SECONDS = 1.5
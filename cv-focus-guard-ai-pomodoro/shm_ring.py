@@ -0,0 +1,94 @@
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always tracks, and would unlink the block when a reader exits
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+class SharedFrameRing:
+    """
+    Fixed-size frames in a multiprocessing.shared_memory block.
+
+    One writer process fills `slots` frame buffers in turn; readers in
+    other processes get NumPy views straight into the shared block (no
+    copy, no pickling). Every slot carries a sequence number that is set
+    to -1 while the slot is being written, so a reader can tell whether
+    the view it holds was overwritten (`is_current`).
+
+    Layout: int64 latest sequence, int64[slots] slot sequences,
+    float64[slots] timestamps, then the frames.
+    """
+
+    def __init__(self, shape, dtype=np.uint8, slots=3, name=None, create=False):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+
+        header = 8 * (1 + 2 * slots)
+        header = (header + 63) // 64 * 64
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=header + slots * frame_bytes)
+        else:
+            self._shm = _attach(name)
+        self.name = self._shm.name
+        self._owner = create
+
+        buf = self._shm.buf
+        self._latest = np.ndarray((1,), np.int64, buf, 0)
+        self._seq = np.ndarray((slots,), np.int64, buf, 8)
+        self._ts = np.ndarray((slots,), np.float64, buf, 8 + 8 * slots)
+        self._frames = np.ndarray((slots,) + self.shape, self.dtype, buf, header)
+        if create:
+            self._latest[0] = 0
+            self._seq[:] = 0
+
+    def describe(self):
+        """
+        What a reader needs to attach: pass as keyword arguments to SharedFrameRing.
+        """
+        return {"name": self.name, "shape": list(self.shape), "dtype": self.dtype.str, "slots": self.slots}
+
+    def write(self, frame, timestamp):
+        seq = int(self._latest[0]) + 1
+        slot = seq % self.slots
+        self._seq[slot] = -1
+        np.copyto(self._frames[slot], frame)
+        self._ts[slot] = timestamp
+        self._seq[slot] = seq
+        self._latest[0] = seq
+        return seq
+
+    def read_latest(self):
+        """
+        (seq, timestamp, frame_view) of the newest complete frame, or None.
+        The view is only valid while `is_current(seq)` holds.
+        """
+        seq = int(self._latest[0])
+        if seq <= 0:
+            return None
+        slot = seq % self.slots
+        if self._seq[slot] != seq:
+            return None
+        return seq, float(self._ts[slot]), self._frames[slot]
+
+    def is_current(self, seq):
+        return self._seq[seq % self.slots] == seq
+
+    def close(self):
+        # drop the views before releasing the buffer
+        self._latest = self._seq = self._ts = self._frames = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,25 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Sources:
+    """
+    Everything the focus loop reads from or writes to the outside world.
+    Any field left as None is built from the real hardware / OS APIs, so
+    `Sources()` is the normal app and fakes.py provides scripted stand-ins.
+
+    camera          cv2.VideoCapture-like: grab(), retrieve(), read(), release()
+    face_mesh       FaceMeshManager-like: process(image_rgb) -> results, close(), stats()
+    activity        ActivityTracker (e.g. listen=False, fed by fakes.ScriptedInput)
+    window_tracker  WindowTracker-like: check_switch(), last_active_window, last_switch_time
+    audio           AudioEngine-like sink: load(), play(name), stop()
+    clock           monotonic seconds; the engine loop, pipeline and fakes share it
+    """
+    camera: Any = None
+    face_mesh: Any = None
+    activity: Any = None
+    window_tracker: Any = None
+    audio: Any = None
+    clock: Callable[[], float] = time.monotonic
@@ -0,0 +1,96 @@
+"""
+The app's focus loop on scripted sources (fakes.py): the FocusTracker /
+FramePipeline wiring PomodoroTimer._warm_up() builds from its `sources`,
+and PomodoroTimer itself where customtkinter and a display are available.
+
+    python -m pytest test_app_sources.py
+"""
+import pytest
+
+from activity_tracker import ActivityTracker
+from fakes import (
+    RecordingAudioSink, ScriptClock, ScriptedCamera, ScriptedFaceMesh, ScriptedWindowTracker,
+)
+from focus_tracker import FocusTracker, open_capture
+from frame_pipeline import FramePipeline
+from settings import FOCUS_WARNING_SECONDS, FOCUS_ALERT_SECONDS
+from sources import Sources
+
+LOOK_AWAY_AT = 1.0
+EDITOR = "main.py - focus - Visual Studio Code"
+
+
+def make_sources(clock, look_away_at=LOOK_AWAY_AT, audio=None):
+    return Sources(
+        camera=ScriptedCamera([(0.0, "focused"), (look_away_at, "left")], clock),
+        face_mesh=ScriptedFaceMesh(),
+        activity=ActivityTracker(listen=False, clock=clock),
+        window_tracker=ScriptedWindowTracker([(0.0, EDITOR)], clock),
+        audio=audio,
+        clock=clock,
+    )
+
+
+def test_look_away_warns_then_alerts_on_scripted_sources():
+    clock = ScriptClock()
+    sources = make_sources(clock)
+    tracker = FocusTracker.create(sources, lambda: True, thresholds_file="", record_timeline=False)
+    cap, capture_info = open_capture(sources)
+    assert cap is sources.camera and capture_info is None
+    pipeline = FramePipeline(cap, tracker.infer_frame, preview_fn=tracker.preview_frame, clock=clock)
+
+    states = []
+    pipeline.start()
+    try:
+        while clock() < LOOK_AWAY_AT + FOCUS_ALERT_SECONDS + 2.0:
+            result = pipeline.latest()
+            if result is not None:
+                state = tracker.update(result)
+                states.append((clock(), state))
+                if state.alert:
+                    break
+            clock.sleep(0.01)
+    finally:
+        pipeline.stop()
+        tracker.close()
+
+    before = [s for t, s in states if t < LOOK_AWAY_AT]
+    assert before and all(s.face and s.reason is None and not s.warning for s in before)
+    assert all(s.window_title == EDITOR and not s.distracted for _, s in states)
+
+    warned_at = next(t for t, s in states if s.warning)
+    alerted_at, alert = next((t, s) for t, s in states if s.alert)
+    assert LOOK_AWAY_AT + FOCUS_WARNING_SECONDS <= warned_at < LOOK_AWAY_AT + FOCUS_WARNING_SECONDS + 0.5
+    assert LOOK_AWAY_AT + FOCUS_ALERT_SECONDS <= alerted_at < LOOK_AWAY_AT + FOCUS_ALERT_SECONDS + 0.5
+    assert alert.reason is not None and alert.face
+
+
+def test_pomodoro_timer_alerts_from_scripted_sources(tmp_path, monkeypatch):
+    ctk = pytest.importorskip("customtkinter")
+    try:
+        root = ctk.CTk()
+    except Exception as e:      # tkinter.TclError without a display
+        pytest.skip(f"no display: {e}")
+    # history database, timeline and thresholds.json are relative paths
+    monkeypatch.chdir(tmp_path)
+    import main
+
+    clock = ScriptClock()
+    audio = RecordingAudioSink(
+        {name: name for name in (main.SOUND_SESSION_END, main.SOUND_FOCUS_ALERT)},
+        cooldowns=main.SOUND_COOLDOWNS, max_per_minute=main.SOUND_MAX_PER_MINUTE, clock=clock,
+    )
+    # look away once warm-up has had time to finish
+    app = main.PomodoroTimer(root, sources=make_sources(clock, look_away_at=3.0, audio=audio))
+    try:
+        app.start_timer()
+        while clock() < 10.0 and not any(name == main.SOUND_FOCUS_ALERT for _, name in audio.log):
+            root.update()
+            clock.sleep(0.01)
+        assert app.engine_error is None
+        assert app.pipeline is not None and app.pipeline.cap is app.sources.camera
+    finally:
+        app.on_closing()
+
+    alerts = [t for t, name in audio.log if name == main.SOUND_FOCUS_ALERT]
+    assert alerts and alerts[0] >= 3.0 + FOCUS_ALERT_SECONDS
@@ -0,0 +1,67 @@
+"""
+AudioEngine cooldowns and rate limits, through RecordingAudioSink on a fake clock.
+
+    python -m pytest test_audio.py
+"""
+import time
+
+from fakes import RecordingAudioSink
+
+SESSION_END = "session_end"
+FOCUS_ALERT = "focus_alert"
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_sink(clock, max_per_minute=12):
+    sink = RecordingAudioSink(
+        {SESSION_END: SESSION_END, FOCUS_ALERT: FOCUS_ALERT},
+        cooldowns={SESSION_END: 0.0, FOCUS_ALERT: 0.0},
+        max_per_minute=max_per_minute, clock=clock,
+    )
+    sink.load()
+    return sink
+
+
+def wait_for(sink, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while sink.played + sink.suppressed < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_session_end_plays_after_a_minute_full_of_alerts():
+    clock = FakeClock()
+    sink = make_sink(clock)
+    try:
+        for i in range(15):
+            clock.now = i * 2.0
+            assert sink.play(FOCUS_ALERT)
+            wait_for(sink, i + 1)
+        clock.now = 30.0
+        assert sink.play(SESSION_END)
+        wait_for(sink, 16)
+    finally:
+        sink.stop()
+
+    alerts = [name for _, name in sink.log if name == FOCUS_ALERT]
+    assert len(alerts) == 12
+    assert sink.suppressed == 3
+    assert sink.log[-1] == (30.0, SESSION_END)
+
+
+def test_rate_limit_and_cooldown_are_per_sound():
+    sink = make_sink(FakeClock(), max_per_minute=2)
+    sink.stop()
+    sink.cooldowns[FOCUS_ALERT] = 5.0
+    assert sink.allow(FOCUS_ALERT, 0.0)
+    assert not sink.allow(FOCUS_ALERT, 4.0)     # cooldown
+    assert sink.allow(FOCUS_ALERT, 5.0)
+    assert not sink.allow(FOCUS_ALERT, 10.0)    # 2 per minute used up
+    assert sink.allow(SESSION_END, 10.0)
+    assert sink.allow(FOCUS_ALERT, 60.0)        # oldest play left the window
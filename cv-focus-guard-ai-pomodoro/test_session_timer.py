@@ -0,0 +1,119 @@
+"""
+CountdownTimer driven like PomodoroTimer's Tk tick loop, on a fake clock.
+
+    python -m pytest test_session_timer.py
+"""
+import random
+
+from session_timer import CountdownTimer
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def run_session(seconds, jitter=0.0, pause_every=None, pause_seconds=90.0, seed=0,
+                random_pauses=False):
+    """
+    Tick like countdown() / _schedule_tick(): every wake-up lands up to
+    `jitter` seconds after the requested `after` delay. Every
+    `pause_every` running seconds the session is paused for
+    `pause_seconds` (exponentially distributed around those means with
+    `random_pauses`); nothing is scheduled while paused and resuming ticks
+    at once, as pause_timer() does.
+    """
+    rng = random.Random(seed)
+
+    def interval(mean):
+        return rng.expovariate(1.0 / mean) if random_pauses else mean
+
+    clock = FakeClock()
+    timer = CountdownTimer(clock=clock)
+    timer.start(seconds)
+
+    running = 0.0
+    next_pause = interval(pause_every) if pause_every is not None else None
+    run = {"shown": [], "wakeups": 0, "pauses": 0, "max_drift": 0.0}
+    while not timer.expired():
+        delay = timer.next_tick_delay_ms() / 1000.0 + rng.uniform(0.0, jitter)
+        if next_pause is not None and next_pause < running + delay:
+            clock.now += next_pause - running
+            running = next_pause
+            timer.pause()
+            frozen = timer.remaining()
+            clock.now += interval(pause_seconds)
+            assert timer.remaining() == frozen
+            timer.resume()
+            run["pauses"] += 1
+            next_pause += interval(pause_every)
+        else:
+            clock.now += delay
+            running += delay
+        run["wakeups"] += 1
+        run["shown"].append(timer.remaining_seconds())
+        true_remaining = max(0.0, seconds - running)
+        run["max_drift"] = max(run["max_drift"], abs(timer.remaining() - true_remaining))
+    run["expiry_late"] = running - seconds
+    return run
+
+
+def test_tick_delay_lands_after_the_second_boundary():
+    clock = FakeClock()
+    timer = CountdownTimer(clock=clock)
+    timer.start(10)
+    assert timer.next_tick_delay_ms() == 1001
+    clock.now += 0.25
+    assert timer.next_tick_delay_ms() == 751
+    assert timer.remaining_seconds() == 10
+
+
+def test_one_wakeup_per_displayed_second():
+    run = run_session(300, jitter=0.05)
+    assert run["shown"] == list(range(299, -1, -1))
+    assert run["wakeups"] == 300
+    assert run["max_drift"] < 1e-6
+    assert 0.0 <= run["expiry_late"] <= 0.001 + 0.05
+
+
+def test_pause_resume_does_not_drift():
+    seconds = 25 * 60
+    run = run_session(seconds, jitter=0.05, pause_every=137.3, pause_seconds=95.0)
+    assert run["pauses"] == int(seconds / 137.3)
+    assert run["max_drift"] < 1e-6
+    assert 0.0 <= run["expiry_late"] <= 0.001 + 0.05
+    # one tick per displayed second, plus the immediate tick on each resume
+    assert run["wakeups"] <= seconds + run["pauses"]
+    assert run["shown"] == sorted(run["shown"], reverse=True)
+    assert run["shown"][-1] == 0
+
+
+def test_hours_of_random_pauses_do_not_drift():
+    seconds = 6 * 3600
+    run = run_session(seconds, jitter=0.05, pause_every=600.0, pause_seconds=120.0,
+                      seed=7, random_pauses=True)
+    assert run["pauses"] > 20
+    assert run["max_drift"] < 1e-6
+    assert 0.0 <= run["expiry_late"] <= 0.001 + 0.05
+    assert run["wakeups"] <= seconds + run["pauses"]
+    assert run["wakeups"] / seconds < 1.01
+    assert run["shown"] == sorted(run["shown"], reverse=True)
+    assert run["shown"][-1] == 0
+
+
+def test_paused_timer_neither_expires_nor_ticks():
+    clock = FakeClock()
+    timer = CountdownTimer(clock=clock)
+    timer.start(60)
+    clock.now += 20.5
+    timer.pause()
+    clock.now += 3600
+    assert not timer.expired()
+    assert timer.remaining() == 39.5
+    timer.resume()
+    assert timer.next_tick_delay_ms() == 501
+    clock.now += 39.5
+    assert timer.expired()
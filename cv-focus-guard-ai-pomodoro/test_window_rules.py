@@ -0,0 +1,32 @@
+"""
+WindowRules with the shipped settings.py rules.
+
+    python -m pytest test_window_rules.py
+"""
+from settings import ON_TASK_WINDOWS, DISTRACTING_WINDOWS
+from window_tracker import WindowRules, ON_TASK, DISTRACTING, NEUTRAL
+
+RULES = WindowRules(on_task=ON_TASK_WINDOWS, distracting=DISTRACTING_WINDOWS)
+
+
+def test_app_titles_are_on_task():
+    assert RULES.classify("Report.docx - Word") == ON_TASK
+    assert RULES.classify("Document1 - Microsoft Word") == ON_TASK
+    assert RULES.classify("Budget.xlsx - Excel") == ON_TASK
+    assert RULES.classify("main.py - focus - Visual Studio Code") == ON_TASK
+    assert RULES.classify("Terminal") == ON_TASK
+    assert RULES.classify("~/src — Terminal") == ON_TASK
+
+
+def test_app_names_inside_other_words_do_not_match():
+    assert RULES.classify("WordPress › Dashboard - Mozilla Firefox") == NEUTRAL
+    assert RULES.classify("Change your password - Google Chrome") == NEUTRAL
+    assert RULES.classify("Wordle - Google Chrome") == NEUTRAL
+    assert RULES.classify("Terminal velocity – YouTube") == DISTRACTING
+    assert RULES.classify("Subreddit stats - Google Chrome") == NEUTRAL
+
+
+def test_distracting_sites():
+    assert RULES.classify("(3) Home / Twitter") == DISTRACTING
+    assert RULES.classify("r/python - Reddit - Mozilla Firefox") == DISTRACTING
+    assert RULES.classify(None) == NEUTRAL
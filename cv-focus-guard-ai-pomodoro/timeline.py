@@ -0,0 +1,229 @@
+"""
+Per-frame metric timeline in chunked, memory-mapped .npy files.
+
+    python timeline.py                       # span and record count of ./timeline
+    python timeline.py --hours 24 --csv last_day.csv
+
+Every verdict is one fixed-width record (RECORD_DTYPE, 34 bytes). Chunks
+are preallocated with open_memmap and filled in place; unused rows have
+t = +inf, so each chunk stays sorted by time and a range query is two
+binary searches on a memory map, whatever the length of the timeline.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from focus_detector import REASON_LABELS
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),               # wall-clock seconds (time.time()), never decreasing
+    ("yaw_ratio", "<f4"),
+    ("pitch_ratio", "<f4"),
+    ("left_ear", "<f4"),
+    ("right_ear", "<f4"),
+    ("face", "u1"),             # 1 if a face was found
+    ("reason", "u1"),           # index into REASON_LABELS
+    ("keys_per_min", "<f4"),
+    ("clicks_per_min", "<f4"),
+])
+
+CHUNK_PREFIX = "timeline-"
+_REASON_CODES = {label: code for code, label in enumerate(REASON_LABELS)}
+
+
+def _chunk_start(name):
+    return int(name[len(CHUNK_PREFIX):-len(".npy")]) / 1000.0
+
+
+class TimelineWriter:
+    """
+    Append-only recorder. Each chunk holds `chunk_records` rows and is
+    named after the time of its first record (milliseconds, zero padded,
+    so names sort by time). A partly filled chunk is trimmed on close.
+    Timestamps are clamped to the last one recorded, also by earlier runs,
+    so a wall-clock step back cannot unsort the timeline.
+    """
+
+    def __init__(self, directory, chunk_records=65536):
+        self.directory = directory
+        self.chunk_records = chunk_records
+        os.makedirs(directory, exist_ok=True)
+
+        self._map = None
+        self._path = None
+        self._columns = None
+        self._count = 0
+        self.records_written = 0
+        last = TimelineReader(directory).last_time()
+        self._last_t = last if last is not None else -np.inf
+
+    def _open_chunk(self, t):
+        """
+        Start a chunk named after `t` and return the chunk's start time.
+        A clamped timestamp can repeat an existing chunk's name; then the
+        next free millisecond is used, so no chunk is overwritten.
+        """
+        ms = int(t * 1000)
+        path = os.path.join(self.directory, f"{CHUNK_PREFIX}{ms:015d}.npy")
+        while os.path.exists(path):
+            ms += 1
+            t = ms / 1000.0
+            path = os.path.join(self.directory, f"{CHUNK_PREFIX}{ms:015d}.npy")
+        self._path = path
+        self._map = np.lib.format.open_memmap(
+            self._path, mode="w+", dtype=RECORD_DTYPE, shape=(self.chunk_records,)
+        )
+        self._map["t"] = np.inf
+        self._columns = tuple(self._map[name] for name in RECORD_DTYPE.names)
+        self._count = 0
+        return t
+
+    def append(self, t, metrics=None, face_detected=False, keys_per_min=0.0, clicks_per_min=0.0):
+        """
+        Write one record. `metrics` is a FocusMetrics or None (NaN ratios).
+        """
+        t = max(t, self._last_t)
+        self._last_t = t
+        if self._map is None or self._count == self.chunk_records:
+            self.close()
+            # the first record is never earlier than the chunk's name
+            t = self._last_t = self._open_chunk(t)
+
+        i = self._count
+        t_col, yaw, pitch, left, right, face, reason, keys, clicks = self._columns
+        if metrics is not None:
+            yaw[i] = metrics.yaw_ratio
+            pitch[i] = metrics.pitch_ratio
+            left[i] = metrics.left_ear
+            right[i] = metrics.right_ear
+            reason[i] = _REASON_CODES.get(metrics.reason, 0)
+        else:
+            yaw[i] = pitch[i] = left[i] = right[i] = np.nan
+            reason[i] = 0
+        face[i] = face_detected
+        keys[i] = keys_per_min
+        clicks[i] = clicks_per_min
+        # time last: a reader never sees a timestamp before the rest of the row
+        t_col[i] = t
+
+        self._count += 1
+        self.records_written += 1
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self):
+        if self._map is None:
+            return
+        count, path = self._count, self._path
+        if count < self.chunk_records:
+            data = np.array(self._map[:count])
+            self._map = self._columns = None
+            np.save(path, data)
+        else:
+            self._map.flush()
+            self._map = self._columns = None
+
+
+class TimelineReader:
+    """
+    Time-range access to a timeline directory. Chunks are opened as
+    read-only memory maps, so only the pages a query touches are read.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def chunks(self):
+        names = sorted(
+            n for n in os.listdir(self.directory)
+            if n.startswith(CHUNK_PREFIX) and n.endswith(".npy")
+        ) if os.path.isdir(self.directory) else []
+        return [(_chunk_start(n), os.path.join(self.directory, n)) for n in names]
+
+    def read(self, start=None, end=None):
+        """
+        Records with start <= t < end (either bound may be None), as one array.
+        """
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        chunks = self.chunks()
+        parts = []
+        for i, (chunk_start, path) in enumerate(chunks):
+            next_start = chunks[i + 1][0] if i + 1 < len(chunks) else np.inf
+            if chunk_start >= end or next_start <= start:
+                continue
+            data = np.load(path, mmap_mode="r")
+            t = data["t"]
+            lo = np.searchsorted(t, start, side="left")
+            hi = np.searchsorted(t, end, side="left")
+            if hi > lo:
+                parts.append(np.array(data[lo:hi]))
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def last_time(self):
+        """
+        Timestamp of the newest record, or None if empty. Only the newest
+        chunk is opened (earlier ones as well if it holds no records).
+        """
+        for _, path in reversed(self.chunks()):
+            t = np.load(path, mmap_mode="r")["t"]
+            n = int(np.searchsorted(t, np.inf, side="left"))
+            if n:
+                return float(t[n - 1])
+        return None
+
+    def span(self):
+        """
+        (first_t, last_t, record_count) over the whole timeline, or None if empty.
+        """
+        chunks = self.chunks()
+        if not chunks:
+            return None
+        total = 0
+        last = None
+        for _, path in chunks:
+            t = np.load(path, mmap_mode="r")["t"]
+            n = int(np.searchsorted(t, np.inf, side="left"))
+            total += n
+            if n:
+                last = float(t[n - 1])
+        return chunks[0][0], last, total
+
+
+def reason_labels(records):
+    return [REASON_LABELS[code] for code in records["reason"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or export the per-frame metric timeline.")
+    parser.add_argument("directory", nargs="?", default="timeline")
+    parser.add_argument("--hours", type=float, default=None, help="only the last N hours")
+    parser.add_argument("--csv", default=None, help="write the selected records to a CSV file")
+    args = parser.parse_args(argv)
+
+    reader = TimelineReader(args.directory)
+    span = reader.span()
+    if span is None:
+        print(f"No timeline in {args.directory}")
+        return 1
+    first, last, count = span
+    print(f"{count} records from {time.ctime(first)} to {time.ctime(last or first)}")
+
+    if args.csv:
+        start = time.time() - args.hours * 3600 if args.hours else None
+        records = reader.read(start=start)
+        np.savetxt(args.csv, records, delimiter=",", header=",".join(RECORD_DTYPE.names),
+                   fmt=["%.3f"] + ["%.5g"] * 4 + ["%d", "%d"] + ["%.1f"] * 2, comments="")
+        print(f"Wrote {len(records)} records to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import time
+
+import cv2
+
+from focus_detector import landmarks_to_array
+from profiler import PROFILER
+
+
+def create_face_mesh(refine_landmarks=False, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+    """
+    Face Mesh model with the settings used by the app and the replay tool.
+    Iris refinement (landmarks 468-477) is off unless asked for; see
+    model_tiers.FaceMeshManager for switching settings at runtime.
+    """
+    import mediapipe as mp
+
+    return mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        refine_landmarks=refine_landmarks,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+
+
+def _run_face_mesh(face_mesh, image):
+    t0 = time.perf_counter()
+    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    t1 = time.perf_counter()
+    results = face_mesh.process(image_rgb)
+    PROFILER.record("color", t1 - t0)
+    PROFILER.record("facemesh", time.perf_counter() - t1)
+    return results
+
+
+def detect_landmarks(face_mesh, frame, roi_tracker=None):
+    """
+    Mirror a BGR camera frame and run Face Mesh on it.
+
+    With a RoiTracker, only the region around the last face is processed
+    and the landmarks are mapped back to full-frame coordinates. If the
+    region contains no face, the full frame is tried once more.
+
+    Returns (mirrored_frame, results, landmarks) where landmarks is an
+    (N, 3) array for the first face, or None if no face was found.
+    """
+    frame = cv2.flip(frame, 1)
+
+    if roi_tracker is None:
+        results = _run_face_mesh(face_mesh, frame)
+        landmarks = None
+        if results.multi_face_landmarks:
+            landmarks = landmarks_to_array(results.multi_face_landmarks[0].landmark)
+        return frame, results, landmarks
+
+    image, box = roi_tracker.crop(frame)
+    t0 = time.perf_counter()
+    results = _run_face_mesh(face_mesh, image)
+    roi_tracker.record(box is not None, time.perf_counter() - t0)
+
+    if not results.multi_face_landmarks and box is not None:
+        # tracking lost: fall back to the full frame
+        roi_tracker.update(None, frame.shape)
+        box = None
+        t0 = time.perf_counter()
+        results = _run_face_mesh(face_mesh, frame)
+        roi_tracker.record(False, time.perf_counter() - t0)
+
+    landmarks = None
+    if results.multi_face_landmarks:
+        landmarks = landmarks_to_array(results.multi_face_landmarks[0].landmark)
+        if box is not None:
+            landmarks = roi_tracker.to_full_frame(landmarks, box, frame.shape)
+    roi_tracker.update(landmarks, frame.shape)
+
+    return frame, results, landmarks
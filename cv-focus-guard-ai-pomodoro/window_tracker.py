@@ -1,16 +1,28 @@
+import re
+import sys
+import threading
 import time
-import pygetwindow as gw
+from collections import deque
+from functools import lru_cache
+
+ON_TASK = "on_task"
+DISTRACTING = "distracting"
+NEUTRAL = "neutral"
+
 
 class WindowTracker:
     def __init__(self):
+        import pygetwindow
+
+        self._get_active = pygetwindow.getActiveWindow
         self.last_active_window = None
         self.last_switch_time = time.time()
 
     def get_active_window(self):
         try:
-            win = gw.getActiveWindow()
+            win = self._get_active()
             if win:
-                return win.title
+                return sys.intern(win.title)
             return None
         except Exception:
             return None
@@ -27,3 +39,92 @@ class WindowTracker:
             return current
 
         return None
+
+
+class WindowRules:
+    """
+    Allow / deny rules for window titles, compiled once.
+    Each rule is a case-insensitive regular expression searched in the
+    title (anchor or use \\b to avoid matching inside other words);
+    on-task rules win over distracting ones. Classifications are cached
+    per title.
+    """
+
+    def __init__(self, on_task=(), distracting=(), cache_size=512):
+        self._on_task = self._compile(on_task)
+        self._distracting = self._compile(distracting)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+    def _classify(self, title):
+        if not title:
+            return NEUTRAL
+        if self._on_task and self._on_task.search(title):
+            return ON_TASK
+        if self._distracting and self._distracting.search(title):
+            return DISTRACTING
+        return NEUTRAL
+
+
+class WindowSampler:
+    """
+    Polls the active window on a background thread so the frame loop never
+    waits on the window manager.
+
+    Each switch is published as a (timestamp, title, classification) tuple
+    on a deque (append / popleft are atomic, no lock needed), and the
+    newest state is kept in `current`, which is replaced as a whole tuple.
+    """
+
+    def __init__(self, rules, tracker=None, poll_interval=0.5, max_events=256):
+        self.rules = rules
+        self.tracker = tracker or WindowTracker()
+        self.poll_interval = poll_interval
+
+        self.events = deque(maxlen=max_events)
+        self.current = (time.time(), None, NEUTRAL)
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.tracker.check_switch()
+            title = self.tracker.last_active_window
+            if title != self.current[1]:
+                event = (self.tracker.last_switch_time, title, self.rules.classify(title))
+                self.current = event
+                self.events.append(event)
+            self._stop.wait(self.poll_interval)
+
+    def poll_events(self):
+        """
+        Drain switch events published since the last call (non-blocking).
+        """
+        drained = []
+        while True:
+            try:
+                drained.append(self.events.popleft())
+            except IndexError:
+                return drained
+
+    def is_distracted(self):
+        return self.current[2] == DISTRACTING